@@ -0,0 +1,364 @@
+# arena.py
+# Many snakes on one board: local players plus computer snakes. All snakes
+# share one Board, so there is a single occupancy grid and free-cell index
+# for collisions and food, plus an owner grid saying whose body a cell is.
+# A tick looks only at the heads: where each one moves (a dict of target
+# cells catches head-to-head crashes), what it runs into (one grid lookup)
+# and whether that is food (one dict lookup). Bodies are only walked when a
+# snake dies and its cells are freed, so the cost of a tick grows with the
+# number of snakes, not their length.
+#
+# Cells are numbered y * width + x, like in Board; rows and width are the
+# playfield, without the two status rows GameState counts.
+#
+#   python arena.py --players 2 --snakes 30    play (arrows / WASD)
+#   python arena.py --bench                    tick time as snakes are added
+import argparse
+import curses
+import random
+import time
+from array import array
+from collections import deque
+
+from board import Board
+from engine import MOVES, OPPOSITE, RIGHT, tick_seconds
+
+DIRECTIONS = tuple(MOVES)
+RESPAWN_TICKS = 20  # Dead snakes come back after this many ticks
+SPAWN_TRIES = 32
+
+# --- Death causes ---
+HEAD_ON = "head"  # Two heads in the same cell, or into each other
+BODY = "body"     # Into a snake's body (its own included)
+WALL = "wall"
+
+
+class Snake:
+    __slots__ = ("id", "body", "direction", "alive", "score", "kills", "deaths", "ai",
+                 "target", "respawn_at", "cause")
+
+    def __init__(self, id, ai):
+        self.id = id
+        self.ai = ai
+        self.body = deque()  # Cells, head first
+        self.direction = RIGHT
+        self.alive = False
+        self.score = 0
+        self.kills = 0
+        self.deaths = 0
+        self.target = None   # The food cell the AI is heading for
+        self.respawn_at = 0
+        self.cause = None
+
+
+class Arena:
+    def __init__(self, rows, width, players=1, snakes=10, food=None, level=1, seed=None, walls=None):
+        self.rows = rows
+        self.width = width
+        self.level = level
+        self.rng = random.Random(seed)
+        self.board = Board(rows, width, walls)
+        self.owner = array('i', [-1]) * (rows * width)  # Snake id per body cell
+        self.snakes = [Snake(i, ai=i >= players) for i in range(players + snakes)]
+        self.food = {}  # Food cells
+        self.food_list = None  # list(self.food), rebuilt at most once per tick for targeting
+        self.tick = 0
+        self.moved = []    # (cell, snake id) of this tick's new heads, for drawing
+        self.vacated = []  # Cells freed this tick
+        self.food_count = food if food is not None else max(1, len(self.snakes) // 2)
+        for snake in self.snakes:
+            self.spawn(snake)
+        for _ in range(self.food_count):
+            self.place_food()
+
+    # --- Board bookkeeping ---
+    def occupy(self, cell, snake):
+        self.board.occupy(*divmod(cell, self.width))
+        self.owner[cell] = snake.id
+
+    def release(self, cell):
+        self.board.release(*divmod(cell, self.width))
+        self.owner[cell] = -1
+        self.vacated.append(cell)
+
+    def place_food(self):
+        for _ in range(SPAWN_TRIES):
+            cell = self.board.random_free(self.rng)
+            if cell is None:
+                return
+            cell = cell[0] * self.width + cell[1]
+            if cell not in self.food:  # Food isn't in the grid, so it can come up twice
+                self.food[cell] = True
+                self.food_list = None
+                self.moved.append((cell, -1))
+                return
+
+    def spawn(self, snake):
+        # A free cell with a free cell to its left for the tail, heading right
+        for _ in range(SPAWN_TRIES):
+            head = self.board.random_free(self.rng)
+            if head is None:
+                return False
+            y, x = head
+            tail = y * self.width + (x - 1) % self.width
+            head = y * self.width + x
+            if not self.board.cells[tail] and head not in self.food and tail not in self.food:
+                break
+        else:
+            return False
+        snake.body = deque((head, tail))
+        self.occupy(head, snake)
+        self.occupy(tail, snake)
+        snake.direction = RIGHT
+        snake.alive = True
+        snake.target = None
+        self.moved.append((head, snake.id))
+        self.moved.append((tail, snake.id))
+        return True
+
+    def neighbor(self, cell, direction):
+        dy, dx = MOVES[direction]
+        y, x = divmod(cell, self.width)
+        return ((y + dy) % self.rows) * self.width + (x + dx) % self.width
+
+    # --- Computer snakes ---
+    # Greedy: the free neighbor closest (on the torus) to a food picked at
+    # random, kept until someone eats it. O(1) per snake.
+    def steer(self, snake):
+        cells = self.board.cells
+        if snake.target not in self.food and self.food:
+            if self.food_list is None:
+                self.food_list = list(self.food)
+            snake.target = self.rng.choice(self.food_list)
+        width = self.width
+        ty, tx = divmod(snake.target, width) if snake.target is not None else (0, 0)
+        best, best_distance = None, None
+        for direction in DIRECTIONS:
+            if direction == OPPOSITE[snake.direction]:
+                continue
+            cell = self.neighbor(snake.body[0], direction)
+            if cells[cell]:
+                continue
+            y, x = divmod(cell, width)
+            dy, dx = abs(y - ty), abs(x - tx)
+            distance = min(dy, self.rows - dy) + min(dx, width - dx)
+            if best_distance is None or distance < best_distance:
+                best, best_distance = direction, distance
+        return best or snake.direction  # Boxed in: keep going
+
+    # --- Tick ---
+    # `turns` maps player ids to directions; computer snakes steer themselves.
+    # Returns the snakes that died this tick.
+    def step(self, turns=None):
+        self.tick += 1
+        self.moved = []
+        self.vacated = []
+        cells = self.board.cells
+        owner = self.owner
+
+        heads = {}  # New head cell -> snakes moving there
+        for snake in self.snakes:
+            if not snake.alive:
+                if snake.respawn_at and self.tick >= snake.respawn_at and self.spawn(snake):
+                    snake.respawn_at = 0
+                continue
+            direction = self.steer(snake) if snake.ai else (turns or {}).get(snake.id)
+            if direction in MOVES and direction != OPPOSITE[snake.direction]:
+                snake.direction = direction
+            cell = self.neighbor(snake.body[0], snake.direction)
+            heads.setdefault(cell, []).append(snake)
+
+        # --- Collisions: all decided before anyone moves ---
+        dead = []
+        for cell, movers in heads.items():
+            if len(movers) > 1:
+                for snake in movers:
+                    snake.cause = HEAD_ON
+                dead += movers
+            elif cells[cell]:
+                snake = movers[0]
+                hit = owner[cell]
+                if hit < 0:
+                    snake.cause = WALL
+                else:
+                    other = self.snakes[hit]
+                    # Two heads moving into each other count as head-on
+                    snake.cause = HEAD_ON if other.body[0] == cell and other.alive else BODY
+                    if hit != snake.id:
+                        other.kills += 1
+                dead.append(snake)
+
+        for snake in dead:
+            snake.alive = False
+            snake.deaths += 1
+            snake.respawn_at = self.tick + RESPAWN_TICKS
+            for cell in snake.body:
+                self.release(cell)
+            snake.body.clear()
+
+        # --- Moves, food and tails ---
+        eaten = 0
+        for cell, movers in heads.items():
+            snake = movers[0]
+            if not snake.alive:
+                continue
+            snake.body.appendleft(cell)
+            self.occupy(cell, snake)
+            self.moved.append((cell, snake.id))
+            self.moved.append((snake.body[1], snake.id))  # The old head is body now
+            if cell in self.food:
+                del self.food[cell]
+                self.food_list = None
+                snake.score += self.level
+                eaten += 1
+            else:
+                self.release(snake.body.pop())
+        for _ in range(eaten):
+            self.place_food()
+        return dead
+
+    def alive(self):
+        return sum(snake.alive for snake in self.snakes)
+
+
+# --- Playing ---
+PLAYER_KEYS = [
+    {curses.KEY_UP: "up", curses.KEY_DOWN: "down", curses.KEY_LEFT: "left", curses.KEY_RIGHT: "right"},
+    {ord('w'): "up", ord('s'): "down", ord('a'): "left", ord('d'): "right"},
+]
+HEAD_CHARS = "@&"  # Player heads; computer snakes are all the same
+AI_HEAD, BODY_CHAR = "o", "o"
+
+
+class ArenaView:
+    # Draws the whole arena once, then per tick only the cells in
+    # Arena.moved/vacated
+    def __init__(self, stdscr, config):
+        from palette import get_color
+        self.stdscr = stdscr
+        self.colors = {"snake": get_color(config, "snake"), "food": get_color(config, "food"),
+                       "wall": get_color(config, "wall"), "player": get_color(config, "highlight"),
+                       "score": get_color(config, "score")}
+        self.wall_char = config["wall_char"]
+        self.empty = config["empty_char"]
+
+    def repaint(self, arena):
+        from maps import WALL as WALL_CELL
+        self.stdscr.erase()
+        for cell, value in enumerate(arena.board.cells):
+            if value == WALL_CELL:
+                self.put(arena, cell, self.wall_char, self.colors["wall"])
+        for snake in arena.snakes:
+            for cell in snake.body:
+                self.put(arena, cell, *self.glyph(arena, snake, cell))
+        for cell in arena.food:
+            self.put(arena, cell, "*", self.colors["food"])
+        self.status(arena)
+
+    def update(self, arena):
+        for cell in arena.vacated:
+            if not arena.board.cells[cell] and cell not in arena.food:
+                self.put(arena, cell, self.empty, 0)
+        for cell, id in arena.moved:
+            if id < 0:
+                self.put(arena, cell, "*", self.colors["food"])
+            elif arena.owner[cell] == id:
+                self.put(arena, cell, *self.glyph(arena, arena.snakes[id], cell))
+        self.status(arena)
+
+    def glyph(self, arena, snake, cell):
+        color = self.colors["snake"] if snake.ai else self.colors["player"]
+        if cell == snake.body[0]:
+            return (AI_HEAD if snake.ai else HEAD_CHARS[snake.id % len(HEAD_CHARS)]), color | curses.A_BOLD
+        return BODY_CHAR, color
+
+    def put(self, arena, cell, char, attr):
+        from menu import safe_addstr
+        y, x = divmod(cell, arena.width)
+        safe_addstr(self.stdscr, y, x, char, attr)
+
+    def status(self, arena):
+        from menu import safe_addstr
+        height, width = self.stdscr.getmaxyx()
+        players = [snake for snake in arena.snakes if not snake.ai]
+        text = "  ".join(f"{HEAD_CHARS[s.id % len(HEAD_CHARS)]} {s.score:04} ({s.kills}k {s.deaths}d)" for s in players)
+        text += f"   snakes {arena.alive()}/{len(arena.snakes)}   Q quit"
+        safe_addstr(self.stdscr, height - 1, 0, text[:width - 1].ljust(width - 1), self.colors["score"])
+
+
+def play(stdscr, args):
+    from main import load_config
+    from palette import build as init_colors
+    from scheduler import FixedStep
+    from targets import CursesTarget
+
+    curses.curs_set(0)
+    screen = CursesTarget(stdscr)
+    config = load_config()
+    init_colors(config)
+    height, width = screen.getmaxyx()
+    walls = None
+    if args.map:
+        import maps
+        walls = maps.load(args.map)
+        height, width = walls.rows + 2, walls.width
+    arena = Arena(height - 2, width, args.players, args.snakes, args.food, args.level, args.seed, walls)
+    view = ArenaView(screen, config)
+    view.repaint(arena)
+    screen.refresh()
+    scheduler = FixedStep(tick_seconds(args.level))
+    turns = {}
+    while True:
+        screen.timeout(scheduler.wait_ms())
+        key = screen.getch()
+        while key != -1:
+            if key in (ord('q'), ord('Q'), 27):
+                return arena
+            for player, keys in enumerate(PLAYER_KEYS[:args.players]):
+                if key in keys:
+                    turns[player] = keys[key]
+            screen.timeout(0)
+            key = screen.getch()
+        for _ in range(scheduler.due()):
+            arena.step(turns)
+            turns = {}
+            view.update(arena)
+        screen.refresh()
+
+
+# --- Benchmark ---
+def bench(counts, rows, width, ticks, food, seed):
+    print(f"{'snakes':>7} {'us/tick':>10} {'us/snake':>9} {'length':>7} {'deaths/tick':>11}")
+    for count in counts:
+        arena = Arena(rows, width, players=0, snakes=count, food=food, seed=seed)
+        for _ in range(200):  # Let the snakes grow first
+            arena.step()
+        deaths = 0
+        started = time.perf_counter()
+        for _ in range(ticks):
+            deaths += len(arena.step())
+        elapsed = (time.perf_counter() - started) / ticks * 1e6
+        length = sum(len(snake.body) for snake in arena.snakes) / max(1, arena.alive())
+        print(f"{count:>7} {elapsed:>10.1f} {elapsed / count:>9.2f} {length:>7.1f} {deaths / ticks:>11.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Many snakes on one board")
+    parser.add_argument("--players", type=int, default=1, choices=(0, 1, 2), help="local players (arrows, WASD)")
+    parser.add_argument("--snakes", type=int, default=20, help="computer snakes")
+    parser.add_argument("--food", type=int, help="food on the board at once (default: half the snakes)")
+    parser.add_argument("--level", type=int, default=1)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--map", help="level map (see maps.py)")
+    parser.add_argument("--bench", action="store_true", help="measure tick time for growing numbers of snakes")
+    parser.add_argument("--counts", default="1,10,50,100,200,400,800", help="snake counts for --bench")
+    parser.add_argument("--size", default="200x400", help="board size for --bench, ROWSxCOLUMNS")
+    parser.add_argument("--ticks", type=int, default=500)
+    args = parser.parse_args()
+    if args.bench:
+        rows, width = (int(n) for n in args.size.split("x"))
+        bench([int(n) for n in args.counts.split(",")], rows, width, args.ticks, args.food, args.seed or 1)
+    else:
+        arena = curses.wrapper(play, args)
+        for snake in arena.snakes[:args.players]:
+            print(f"player {snake.id + 1}: {snake.score} points, {snake.kills} kills, {snake.deaths} deaths")
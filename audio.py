@@ -0,0 +1,313 @@
+# audio.py
+# Sound effects. Samples are decoded once into memory and played by a
+# background thread, so play() never blocks the game loop. The output backend
+# is picked at runtime; NullSink and FileSink cover headless runs.
+#
+#   python audio.py --stall-test    ticks keep time while the device hangs
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+SOUND_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLES = {"eat": "eat.wav", "bonus": "bonus.wav"}
+
+
+class Sample:
+    def __init__(self, path):
+        with wave.open(path, "rb") as f:
+            self.channels = f.getnchannels()
+            self.sample_width = f.getsampwidth()
+            self.rate = f.getframerate()
+            self.frames = f.readframes(f.getnframes())
+        with open(path, "rb") as f:
+            self.wav_bytes = f.read()  # Some backends want the whole file
+
+    def duration(self):
+        return len(self.frames) / (self.channels * self.sample_width * self.rate)
+
+
+def load_samples(sound_dir=SOUND_DIR):
+    samples = {}
+    for name, filename in SAMPLES.items():
+        try:
+            samples[name] = Sample(os.path.join(sound_dir, filename))
+        except (OSError, EOFError, wave.Error):
+            pass  # Missing or unreadable samples are simply silent
+    return samples
+
+
+# --- Backends ---
+class NullSink:
+    name = "null"
+
+    def play(self, sample):
+        pass
+
+    def close(self):
+        pass
+
+
+class FileSink:
+    # Appends everything played to one WAV file (headless runs, debugging)
+    name = "file"
+
+    def __init__(self, path):
+        self.path = path
+        self.out = None
+
+    def play(self, sample):
+        if self.out is None:
+            self.out = wave.open(self.path, "wb")
+            self.out.setnchannels(sample.channels)
+            self.out.setsampwidth(sample.sample_width)
+            self.out.setframerate(sample.rate)
+            self.format = (sample.channels, sample.sample_width, sample.rate)
+        if (sample.channels, sample.sample_width, sample.rate) == self.format:
+            self.out.writeframes(sample.frames)
+
+    def close(self):
+        if self.out is not None:
+            self.out.close()
+            self.out = None
+
+
+class SimpleAudioSink:
+    name = "simpleaudio"
+
+    def __init__(self):
+        import simpleaudio
+        self.simpleaudio = simpleaudio
+
+    def play(self, sample):
+        self.simpleaudio.play_buffer(sample.frames, sample.channels, sample.sample_width, sample.rate)
+
+    def close(self):
+        self.simpleaudio.stop_all()
+
+
+class WinsoundSink:
+    name = "winsound"
+
+    def __init__(self):
+        import winsound
+        self.winsound = winsound
+        self.files = {}
+
+    def play(self, sample):
+        # SND_MEMORY can't be combined with SND_ASYNC, so each sample is
+        # written out once and played from its file
+        path = self.files.get(sample)
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="snake-", suffix=".wav")
+            with os.fdopen(fd, "wb") as f:
+                f.write(sample.wav_bytes)
+            self.files[sample] = path
+        self.winsound.PlaySound(path, self.winsound.SND_FILENAME | self.winsound.SND_ASYNC)
+
+    def close(self):
+        self.winsound.PlaySound(None, 0)
+        for path in self.files.values():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.files.clear()
+
+
+class CommandSink:
+    # Pipes the in-memory WAV into aplay/paplay/afplay-style players
+    COMMANDS = (["aplay", "-q", "-"], ["paplay"], ["pw-play", "-"])
+
+    def __init__(self, command=None):
+        for command in [command] if command else self.COMMANDS:
+            if shutil.which(command[0]):
+                self.command = command
+                self.name = os.path.basename(command[0])
+                break
+        else:
+            raise OSError("no audio player found")
+        self.process = None
+
+    def play(self, sample):
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()  # Newest sound wins, like winsound's SND_ASYNC
+        self.process = subprocess.Popen(self.command, stdin=subprocess.PIPE,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        # A clip is bigger than a pipe buffer and the player reads it in real
+        # time, so each player gets its own writer; killing the player ends it
+        threading.Thread(target=self.feed, args=(self.process.stdin, sample.wav_bytes),
+                         name="audio-feed", daemon=True).start()
+
+    @staticmethod
+    def feed(pipe, data):
+        try:
+            pipe.write(data)
+            pipe.close()
+        except OSError:
+            pass
+
+    def close(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+
+
+def open_sink(backend="auto"):
+    if backend == "null":
+        return NullSink()
+    if backend.startswith("file:"):
+        return FileSink(backend[5:])
+    candidates = {"simpleaudio": SimpleAudioSink, "winsound": WinsoundSink, "command": CommandSink}
+    if backend in candidates:
+        order = [candidates[backend]]
+    elif sys.platform == "win32":
+        order = [SimpleAudioSink, WinsoundSink]
+    else:
+        order = [SimpleAudioSink, CommandSink]
+    for sink in order:
+        try:
+            return sink()
+        except (ImportError, OSError):
+            continue
+    return NullSink()
+
+
+class Audio:
+    # Decoding the samples and opening the backend happen on the mixer
+    # thread, so creating an Audio costs the caller nothing. `backend` is a
+    # name for open_sink() or a sink object.
+    def __init__(self, config, backend="auto", samples=None, max_pending=4):
+        self.config = config
+        self.backend = backend
+        self.samples = samples if samples is not None else {}
+        self.load = samples is None
+        self.sink = NullSink()
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.dropped = 0
+        self.thread = threading.Thread(target=self.run, name="audio-mixer", daemon=True)
+        self.thread.start()
+
+    # Never blocks: if the mixer is behind, the sound is dropped
+    def play(self, name):
+        if not self.config["sound_enabled"]:
+            return
+        sample = self.samples.get(name)
+        if sample is None:
+            return
+        try:
+            self.pending.put_nowait(sample)
+        except queue.Full:
+            self.dropped += 1
+
+    def run(self):
+        if self.load:
+            self.samples = load_samples()
+        self.sink = open_sink(self.backend) if isinstance(self.backend, str) else self.backend
+        while True:
+            sample = self.pending.get()
+            if sample is None:
+                break
+            try:
+                self.sink.play(sample)
+            except Exception:
+                pass  # A broken audio device must never take the game down
+
+    def close(self, timeout=1.0):
+        try:
+            self.pending.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self.thread.join(timeout)
+        self.sink.close()
+
+
+# --- Stall test ---
+PLAY_BUDGET = 0.001  # Seconds play() may take (p99), whatever the device does
+
+
+class BlockingSink:
+    # A device that takes `seconds` per sound, or hangs for good
+    name = "blocking"
+
+    def __init__(self, seconds=None):
+        self.seconds = seconds
+        self.hang = threading.Event()
+
+    def play(self, sample):
+        if self.seconds is None:
+            self.hang.wait()
+        else:
+            time.sleep(self.seconds)
+
+    def close(self):
+        self.hang.set()
+
+
+def stall_test(ticks, interval, block):
+    from perf import Window
+    from scheduler import FixedStep
+    samples = load_samples()
+    if not samples:
+        raise SystemExit("stall test: no samples to play")
+    sink = BlockingSink(block)
+    audio = Audio({"sound_enabled": True}, sink, samples)
+    scheduler = FixedStep(interval)
+    calls = Window()
+    lateness = Window()
+    for tick in range(ticks):
+        time.sleep(max(0.0, scheduler.wait_ms() / 1000))
+        due_at = scheduler.next_tick
+        scheduler.due()
+        lateness.add(max(0.0, time.monotonic() - due_at))
+        for name in samples:  # Every sound, every tick: far more than a game plays
+            started = time.perf_counter()
+            audio.play(name)
+            calls.add(time.perf_counter() - started)
+    audio.close(timeout=0.1)
+    _, _, p99, worst = calls.percentiles()
+    late = lateness.percentiles()
+    print(f"{ticks} ticks of {interval * 1000:.0f} ms, sink {'hung' if block is None else f'{block}s per sound'}: "
+          f"play() p99 {p99:.3f} ms max {worst:.3f} ms, tick lateness p99 {late[2]:.2f} ms max {late[3]:.2f} ms, "
+          f"{audio.dropped} sounds dropped")
+    # A play() that waited for the device would take its whole block time
+    if p99 > PLAY_BUDGET * 1000 or worst > interval * 1000 or late[2] > interval * 1000:
+        raise SystemExit("stall test: FAILED")
+    player_test(samples, interval)
+    print("stall test: ok")
+
+
+def player_test(samples, interval):
+    # The mixer thread itself must not wait on a player that reads slowly
+    # (or never): a stand-in player that sleeps instead of reading its pipe
+    sink = CommandSink([sys.executable, "-c", "import time; time.sleep(10)"])
+    worst = 0.0
+    try:
+        for sample in list(samples.values()) * 3:
+            started = time.perf_counter()
+            sink.play(sample)
+            worst = max(worst, time.perf_counter() - started)
+    finally:
+        sink.close()
+    print(f"player that never reads: sink play() max {worst * 1000:.1f} ms")
+    if worst > interval:
+        raise SystemExit("stall test: FAILED (mixer waited on the player)")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Sound effects")
+    parser.add_argument("--stall-test", action="store_true",
+                        help="play from a timed tick loop into a device that blocks")
+    parser.add_argument("--ticks", type=int, default=500)
+    parser.add_argument("--interval", type=float, default=0.01, help="seconds per tick")
+    parser.add_argument("--block", type=float, help="seconds the device takes per sound (default: hangs)")
+    args = parser.parse_args()
+    if args.stall_test:
+        stall_test(args.ticks, args.interval, args.block)
+    else:
+        parser.print_help()
@@ -0,0 +1,343 @@
+# autopilot.py
+# Computer player for demos and soak tests. Each tick it returns a direction
+# for GameState.step(). The board is a torus (moves wrap at the edges), and
+# cells are numbered y * width + x, like in Board.
+#
+# Without walls the board has a cycle through every cell (all but one when
+# both sides are odd, see hamiltonian_cycle). Once the snake lies in order
+# along it, the autopilot follows the cycle, taking shortcuts toward the
+# food only when they leave enough room ahead of the head. That costs O(1)
+# per tick and only dies to growth it can't make room for. Otherwise it
+# chases the food with A*, keeps the path until the food moves (patching in
+# a short detour if something blocks it), and only takes a path if the tail
+# is still reachable from where it ends. Every search gives up after a
+# bounded number of cells and works on the board in place, so a tick costs
+# at most a few such searches whatever the board size.
+from array import array
+from collections import deque
+from functools import lru_cache
+from itertools import islice
+import math
+
+from engine import UP, DOWN, LEFT, RIGHT, tick_seconds
+
+SEARCH_LIMIT = 2048  # Cells a search may expand before it gives up
+REPAIR_LIMIT = 256   # The same, for a detour around a blocked path
+
+
+def torus_moves(cell, rows, width):
+    # The four (direction, cell) moves from `cell`, in MOVES order
+    y, x = divmod(cell, width)
+    return ((UP, cell - width if y else cell + (rows - 1) * width),
+            (DOWN, cell + width if y < rows - 1 else x),
+            (LEFT, cell - 1 if x else cell + width - 1),
+            (RIGHT, cell + 1 if x < width - 1 else cell - x))
+
+
+@lru_cache(maxsize=8)
+def hamiltonian_cycle(rows, width):
+    # Returns (path, order): the cells in cycle order, and each cell's index
+    # in it; None when the board is too thin. With an even number of rows:
+    # along row 0 from column 1, back along row 1, ... and up column 0 to
+    # the start. Otherwise the same, transposed.
+    #
+    # With both sides odd there is no such cycle through every cell: the
+    # rows go the same way down to the last two, which are crossed column by
+    # column, leaving out the bottom cell of column 0. That cell shares its
+    # neighbors on the cycle with (rows - 2, 1), so it gets the same index:
+    # the snake can step into either one in its place.
+    if rows < 2 or width < 2:
+        return None
+    if rows % 2 and width % 2:
+        path = array('i', [0])
+        for y in range(rows - 2):
+            path.extend(y * width + x for x in (range(1, width) if y % 2 == 0 else range(width - 1, 0, -1)))
+        for i, x in enumerate(range(width - 1, 0, -1)):
+            pair = ((rows - 2) * width + x, (rows - 1) * width + x)
+            path.extend(pair if i % 2 == 0 else reversed(pair))
+        path.extend(y * width for y in range(rows - 2, 0, -1))
+        order = array('i', bytes(4 * rows * width))
+        for i, c in enumerate(path):
+            order[c] = i
+        order[(rows - 1) * width] = order[(rows - 2) * width + 1]
+        return path, order
+    if rows % 2 == 0:
+        lines, length, cell = rows, width, lambda line, i: line * width + i
+    else:
+        lines, length, cell = width, rows, lambda line, i: i * width + line
+    path = array('i', [cell(0, 0)])
+    for line in range(lines):
+        steps = range(1, length) if line % 2 == 0 else range(length - 1, 0, -1)
+        path.extend(cell(line, i) for i in steps)
+    path.extend(cell(line, 0) for line in range(lines - 1, 0, -1))
+    order = array('i', bytes(4 * len(path)))
+    for i, c in enumerate(path):
+        order[c] = i
+    return path, order
+
+
+def astar(cells, rows, width, start, goal, allow_goal=False, limit=SEARCH_LIMIT):
+    # A short path of cells from `start` (excluded) to `goal` through free
+    # cells, guided by the distance on the torus; `allow_goal` lets the goal
+    # itself be occupied (the tail). None when there is no path, [] when the
+    # search gave up after expanding `limit` cells.
+    goal_y, goal_x = divmod(goal, width)
+    wrap = (rows - 1) * width
+    parent = {start: start}
+    # The open cells by estimated length (steps so far + distance left) over
+    # the start's. A step changes it by 0, 1 or 2, never down, so a list of
+    # stacks does for a heap; a stack also takes the deepest of equal
+    # estimates first, which heads straight for the goal.
+    stacks = [[start]]
+    level = expanded = 0
+    while level < len(stacks):
+        stack = stacks[level]
+        if not stack:
+            level += 1
+            continue
+        cell = stack.pop()
+        expanded += 1
+        if expanded > limit:
+            return []
+        y, x = divmod(cell, width)
+        dy = abs(y - goal_y)
+        dx = abs(x - goal_x)
+        base = level + 1 - min(dy, rows - dy) - min(dx, width - dx)  # A neighbor's estimate, less its distance left
+        for nxt in (cell - width if y else cell + wrap, cell + width if y < rows - 1 else x,
+                    cell - 1 if x else cell + width - 1, cell + 1 if x < width - 1 else cell - x):
+            if nxt == goal and (allow_goal or not cells[nxt]):
+                path = [nxt]
+                while cell != start:
+                    path.append(cell)
+                    cell = parent[cell]
+                path.reverse()
+                return path
+            if cells[nxt] or nxt in parent:
+                continue
+            parent[nxt] = cell
+            y, x = divmod(nxt, width)
+            dy = abs(y - goal_y)
+            dx = abs(x - goal_x)
+            estimate = base + min(dy, rows - dy) + min(dx, width - dx)
+            while len(stacks) <= estimate:
+                stacks.append([])
+            stacks[estimate].append(nxt)
+    return None
+
+
+def reachable(cells, rows, width, start, limit):
+    # Size of the free region around `start`, counting at most `limit` cells
+    seen = {start}
+    queue = deque([start])
+    while queue and len(seen) <= limit:
+        for _, nxt in torus_moves(queue.popleft(), rows, width):
+            if nxt not in seen and not cells[nxt]:
+                seen.add(nxt)
+                queue.append(nxt)
+    return len(seen)
+
+
+class Autopilot:
+    def __init__(self):
+        self.generation = None
+
+    # Board rebuilt (new game, resize, restored save): drop everything cached
+    def restart(self, state):
+        self.generation = state.generation
+        self.rows = state.rows
+        self.width = state.width
+        self.size = state.rows * state.width
+        # The cycle runs through every cell, so it's no use with walls
+        self.cycle = None if state.board.walls else hamiltonian_cycle(state.rows, state.width)
+        self.spare = None  # Both sides odd: the cell left out of the cycle and the one it shares a place with
+        if self.cycle and len(self.cycle[0]) < self.size:
+            left_out = (state.rows - 1) * state.width
+            self.spare = (left_out, (state.rows - 2) * state.width + 1)
+        self.on_cycle = False
+        self.path = deque()
+        self.goal = None
+
+    def choose(self, state):
+        if state.generation != self.generation:
+            self.restart(state)
+        head = state.snake[0]
+        if head[0] >= state.rows or head[1] >= state.width:
+            return None  # Left off the board by a resize; it wraps back in
+        head = head[0] * self.width + head[1]
+        if self.on_cycle:
+            return self.cycle_move(state, head)
+
+        target = self.target(state)
+        cells = state.board.cells
+        if self.path and self.goal not in (None, target) and target in self.path:
+            # The new food lies on the way to the old (a bonus appearing, say)
+            while self.path[-1] != target:
+                self.path.pop()
+            self.goal = target
+        if self.path and self.goal == target and (not cells[self.path[0]] or self.repair(cells, head)):
+            return self.direction(head, self.path.popleft())
+
+        if self.cycle and self.enter_cycle(state):
+            return self.cycle_move(state, head)
+        self.plan(state, head, target)
+        if self.path:
+            return self.direction(head, self.path.popleft())
+        return self.widest_move(state, head)
+
+    def target(self, state):
+        food = state.bonus_food if state.bonus_active and state.bonus_food else state.food
+        return food[0] * self.width + food[1] if food else None
+
+    def moves(self, cell):
+        return torus_moves(cell, self.rows, self.width)
+
+    def direction(self, head, cell):
+        for direction, nxt in self.moves(head):
+            if nxt == cell:
+                return direction
+        return None
+
+    # --- Hamiltonian cycle ---
+    def growth_margin(self, state):
+        # How much the snake can grow before the gaps left by shortcuts have
+        # passed the tail: a whole bonus, what's left of the current one, and
+        # some food along the way
+        ticks = math.ceil(state.width * 0.15 * (9 - state.level) / tick_seconds(state.level))
+        if state.bonus_active:
+            ticks += math.ceil(state.bonus_remaining / tick_seconds(state.level))
+        return ticks + self.size // 50 + 2
+
+    def enter_cycle(self, state):
+        # The body must run forward along the cycle from tail to head, with
+        # room ahead of the head for the growth margin
+        path, order = self.cycle
+        width = self.width
+        size = len(path)
+        tail = state.snake[-1]
+        start = order[tail[0] * width + tail[1]]
+        last = -1
+        for y, x in reversed(state.snake):
+            if y >= self.rows or x >= width:
+                return False
+            position = (order[y * width + x] - start) % size
+            if position <= last:
+                return False
+            last = position
+        if last + 1 + self.growth_margin(state) >= size:
+            return False
+        self.on_cycle = True
+        return True
+
+    def cycle_move(self, state, head):
+        # The free cells from the head forward to the tail are exactly the
+        # ones ahead on the cycle; any of them can be jumped to as long as
+        # the growth margin still fits behind the new head
+        path, order = self.cycle
+        size = len(path)
+        tail = state.snake[-1]
+        here = order[head]
+        ahead = (order[tail[0] * self.width + tail[1]] - here) % size
+        room = ahead - 1 - self.growth_margin(state)
+        if 2 * len(state.snake) > size:
+            room = 0  # No more shortcuts: let the tail close the gaps they left
+        target = self.target(state)
+        reach = (order[target] - here) % size if target is not None else 1
+        best, best_distance = path[(here + 1) % size], 1
+        cells = state.board.cells
+        for _, cell in self.moves(head):
+            distance = (order[cell] - here) % size
+            if best_distance < distance <= reach and distance < room and not cells[cell]:
+                best, best_distance = cell, distance
+        if self.spare and best in self.spare:
+            # Either cell of the place shared on the cycle will do. Eat there
+            # unless the snake would then fill the cycle: the other cell of
+            # the two can't be reached from there.
+            eat = len(state.snake) + 2 < size
+            for _, cell in self.moves(head):
+                if cell in self.spare and not cells[cell] and (cell == target) == eat:
+                    best = cell
+        return self.direction(head, best)
+
+    # --- Chasing ---
+    def plan(self, state, head, target):
+        cells = state.board.cells
+        self.goal = target
+        if target is not None:
+            path = astar(cells, self.rows, self.width, head, target)
+            if path and self.safe(state, path):
+                self.path = deque(path)
+                return
+        # No safe way to the food: follow the tail for a while and try again
+        tail = state.snake[-1]
+        tail = tail[0] * self.width + tail[1]
+        path = astar(cells, self.rows, self.width, head, tail, allow_goal=True)
+        if path and len(path) > 1:
+            self.path = deque(path)
+            self.goal = None  # Replan once it's used up
+        else:
+            self.path = deque()
+
+    def repair(self, cells, head):
+        # The next cell of the path is taken: look nearby for a way to a later
+        # free cell of it and splice that in. False if there is none close.
+        ahead = {cell: i for i, cell in enumerate(self.path) if not cells[cell]}
+        parent = {head: head}
+        queue = deque([head])
+        while queue and len(parent) <= REPAIR_LIMIT:
+            cell = queue.popleft()
+            for _, nxt in self.moves(cell):
+                if nxt in parent or cells[nxt]:
+                    continue
+                parent[nxt] = cell
+                if nxt in ahead:
+                    detour = deque()
+                    while nxt != head:
+                        detour.appendleft(nxt)
+                        nxt = parent[nxt]
+                    detour.extend(islice(self.path, ahead[detour[-1]] + 1, None))
+                    self.path = detour
+                    return True
+                queue.append(nxt)
+        return False
+
+    def safe(self, state, path):
+        # After following `path` (and growing by one), can the head still
+        # reach the tail? A search that runs out of cells to expand before
+        # finding it has found a region bigger than the snake, or big enough
+        # to move around in until the tail has moved on.
+        body = len(state.snake) + 1
+        kept = body - len(path)
+        if kept <= 0:
+            return True  # The path is longer than the whole snake
+        # The board is changed in place and put back: a copy would cost
+        # its whole area
+        cells = state.board.cells
+        width = self.width
+        snake = state.snake
+        freed = [y * width + x for y, x in islice(reversed(snake), len(snake) - kept)
+                 if y * width + x < self.size]
+        for cell in path:
+            cells[cell] = 1
+        for cell in freed:
+            cells[cell] = 0
+        y, x = snake[kept - 1]
+        try:
+            return astar(cells, self.rows, width, path[-1], y * width + x, True, min(body, SEARCH_LIMIT)) is not None
+        finally:
+            for cell in path:
+                cells[cell] = 0
+            for cell in freed:
+                cells[cell] = 1
+
+    def widest_move(self, state, head):
+        # Last resort: the move into the largest free region
+        cells = state.board.cells
+        limit = min(len(state.snake) + 1, SEARCH_LIMIT)
+        best, best_size = None, -1
+        for direction, cell in self.moves(head):
+            if cells[cell]:
+                continue
+            size = reachable(cells, self.rows, self.width, cell, limit)
+            if size > best_size:
+                best, best_size = direction, size
+        return best
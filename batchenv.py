@@ -0,0 +1,283 @@
+# batchenv.py
+# Many games stepped at once with NumPy, for training agents. The rules are
+# the ones in engine.GameState (wrap-around, self-collision, a bonus every
+# 5th food, level scoring); only food placement uses NumPy's RNG instead of
+# random.Random. Cells are numbered y * width + x, like in Board.
+#
+# Per game: the snake is a ring buffer of cells (`body`, `head`, `length`)
+# and `occupied` is a (games, cells) occupancy grid. Finished games are reset
+# at the end of the step that finished them.
+#
+# Needs NumPy (pip install numpy); nothing else in the game imports this.
+#
+#   python batchenv.py --parity        check against engine.GameState
+#   python batchenv.py --bench 4096    steps per second
+import argparse
+import time
+
+import numpy as np
+
+from engine import MOVES, OPPOSITE, RIGHT, tick_seconds
+
+DIRECTIONS = tuple(MOVES)  # Action i is DIRECTIONS[i]; -1 keeps going
+DY = np.array([MOVES[d][0] for d in DIRECTIONS], dtype=np.int64)
+DX = np.array([MOVES[d][1] for d in DIRECTIONS], dtype=np.int64)
+OPPOSITE_ACTION = np.array([DIRECTIONS.index(OPPOSITE[d]) for d in DIRECTIONS], dtype=np.int8)
+SAMPLE_TRIES = 8  # Rejection-sampling rounds before scanning for free cells
+
+
+class BatchEnv:
+    # height/width are terminal dimensions, like GameState
+    def __init__(self, games, height, width, level=1, seed=None):
+        self.games = games
+        self.height = height
+        self.width = width
+        self.rows = height - 2
+        self.cells = self.rows * width
+        self.level = level
+        self.tick_seconds = tick_seconds(level)
+        self.rng = np.random.default_rng(seed)
+
+        self.body = np.zeros((games, self.cells), dtype=np.int32)  # Ring buffer of cells
+        self.head = np.zeros(games, dtype=np.int64)                # Index of the head in `body`
+        self.length = np.zeros(games, dtype=np.int64)
+        self.occupied = np.zeros((games, self.cells), dtype=np.uint8)
+        self.direction = np.zeros(games, dtype=np.int8)
+        self.food = np.zeros(games, dtype=np.int64)                # -1: none (board full)
+        self.bonus_food = np.full(games, -1, dtype=np.int64)
+        self.bonus_active = np.zeros(games, dtype=bool)
+        self.bonus_duration = np.zeros(games)
+        self.bonus_remaining = np.zeros(games)
+        self.score = np.zeros(games, dtype=np.int64)
+        self.eat_count = np.zeros(games, dtype=np.int64)
+        self.tick = np.zeros(games, dtype=np.int64)
+        self.dead = np.zeros(games, dtype=bool)
+        self.won = np.zeros(games, dtype=bool)
+        self.reset(np.ones(games, dtype=bool))
+
+    def reset(self, mask):
+        games = np.flatnonzero(mask)
+        if not len(games):
+            return
+        y, x = self.height // 2, self.width // 2
+        head, tail = y * self.width + x, y * self.width + x - 1
+        self.occupied[games] = 0
+        self.occupied[games, head] = 1
+        self.occupied[games, tail] = 1
+        self.body[games, 0] = tail
+        self.body[games, 1] = head
+        self.head[games] = 1
+        self.length[games] = 2
+        self.direction[games] = DIRECTIONS.index(RIGHT)
+        self.bonus_food[games] = -1
+        self.bonus_active[games] = False
+        self.bonus_duration[games] = 0
+        self.bonus_remaining[games] = 0
+        for array in (self.score, self.eat_count, self.tick):
+            array[games] = 0
+        self.dead[games] = False
+        self.won[games] = False
+        self.food[games] = self.random_free(games)
+
+    def random_free(self, games):
+        # A uniformly random free cell for each game in `games`, or -1 when
+        # its board is full
+        result = np.full(len(games), -1, dtype=np.int64)
+        todo = np.arange(len(games))
+        for _ in range(SAMPLE_TRIES):
+            cells = self.rng.integers(0, self.cells, size=len(todo))
+            free = self.occupied[games[todo], cells] == 0
+            result[todo[free]] = cells[free]
+            todo = todo[~free]
+            if not len(todo):
+                return result
+        for i in todo:  # Nearly full boards: pick among the free cells directly
+            free = np.flatnonzero(self.occupied[games[i]] == 0)
+            if len(free):
+                result[i] = free[self.rng.integers(len(free))]
+        return result
+
+    # Advance every game by one tick. `actions` holds a direction index per
+    # game, or -1 to keep going. Returns (reward, done): the score gained this
+    # tick and which games ended. Ended games are reset before returning;
+    # their final results are in `final_score`/`final_length`.
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int8)
+        turn = (actions >= 0) & (actions != OPPOSITE_ACTION[self.direction])
+        self.direction = np.where(turn, actions, self.direction).astype(np.int8)
+        self.tick += 1
+        self.bonus_remaining -= np.where(self.bonus_active, self.tick_seconds, 0.0)
+        score_before = self.score.copy()
+
+        old_head = self.body[np.arange(self.games), self.head]
+        y, x = np.divmod(old_head, self.width)
+        y = (y + DY[self.direction]) % self.rows
+        x = (x + DX[self.direction]) % self.width
+        new_head = y * self.width + x
+
+        # --- Self-collision ---
+        self.dead = self.occupied[np.arange(self.games), new_head].astype(bool)
+        live = np.flatnonzero(~self.dead)
+        new_head = new_head[live]
+        self.head[live] = (self.head[live] + 1) % self.cells
+        self.body[live, self.head[live]] = new_head
+        self.occupied[live, new_head] = 1
+        self.length[live] += 1
+
+        # --- Bonus: eaten or expired; either way the food moves, unless it's
+        # being eaten this tick ---
+        ate = new_head == self.food[live]
+        bonus = self.bonus_active[live]
+        eaten = bonus & (new_head == self.bonus_food[live])
+        expired = bonus & ~eaten & (self.bonus_remaining[live] < 0)
+        games = live[eaten]
+        if len(games):
+            time_taken = self.bonus_duration[games] - self.bonus_remaining[games]
+            multiplier = np.trunc((self.bonus_duration[games] - time_taken) * self.level)
+            self.score[games] += 10 * np.maximum(0, multiplier).astype(np.int64)
+        games = live[eaten | expired]
+        if len(games):
+            self.bonus_active[games] = False
+            self.bonus_food[games] = -1
+        games = live[(eaten | expired) & ~ate]
+        if len(games):
+            self.food[games] = self.random_free(games)
+
+        # --- Food ---
+        games = live[ate]
+        if len(games):
+            self.score[games] += self.level
+            self.eat_count[games] += 1
+            spawn = games[self.eat_count[games] % 5 == 0]
+            if len(spawn):
+                self.bonus_food[spawn] = self.random_free(spawn)
+                self.bonus_active[spawn] = self.bonus_food[spawn] >= 0
+                self.bonus_duration[spawn] = self.width * 0.15 * (9 - self.level)
+                self.bonus_remaining[spawn] = self.bonus_duration[spawn]
+            self.food[games] = self.random_free(games)
+
+        # --- Tail: stays put after eating and while a bonus is up ---
+        games = live[~ate & ~self.bonus_active[live]]
+        if len(games):
+            tail = self.body[games, (self.head[games] - self.length[games] + 1) % self.cells]
+            self.occupied[games, tail] = 0
+            self.length[games] -= 1
+
+        self.won = ~self.dead & (self.food < 0)
+        done = self.dead | self.won
+        reward = self.score - score_before
+        self.final_score = np.where(done, self.score, 0)
+        self.final_length = np.where(done, self.length, 0)
+        self.reset(done)
+        return reward, done
+
+    def snake(self, game):
+        # Cells of one game's snake as (y, x), head first, like GameState.snake
+        indices = (self.head[game] - np.arange(self.length[game])) % self.cells
+        return [divmod(int(cell), self.width) for cell in self.body[game, indices]]
+
+    def observe(self):
+        # (games, 3, rows, width) uint8 planes: body, head, food (bonus food
+        # included)
+        obs = np.zeros((self.games, 3, self.cells), dtype=np.uint8)
+        games = np.arange(self.games)
+        obs[:, 0] = self.occupied
+        obs[games, 1, self.body[games, self.head]] = 1
+        has_food = self.food >= 0
+        obs[games[has_food], 2, self.food[has_food]] = 1
+        bonus = self.bonus_active
+        obs[games[bonus], 2, self.bonus_food[bonus]] = 1
+        return obs.reshape(self.games, 3, self.rows, self.width)
+
+
+# --- Parity with engine.GameState ---
+class ScriptedRng:
+    # Stands in for GameState.rng so create_food() returns the cells the
+    # batch environment picked, in the order the engine asks for them
+    def __init__(self, board):
+        self.board = board
+        self.cells = []
+
+    def randrange(self, count):
+        y, x = self.cells.pop(0)
+        return self.board.slot[y * self.board.width + x]
+
+
+def parity(games, steps, height, width, level, seed):
+    from engine import GameState
+
+    def cell(value):
+        return divmod(int(value), width) if value >= 0 else None
+
+    def new_state(i):
+        state = GameState(height, width, level, seed=0)
+        state.food = cell(env.food[i])
+        state.rng = ScriptedRng(state.board)
+        return state
+
+    env = BatchEnv(games, height, width, level, seed)
+    rng = np.random.default_rng(seed)
+    states = [new_state(i) for i in range(games)]
+    finished = 0
+    for step in range(steps):
+        # Mostly straight on, sometimes a turn, so games last a while
+        actions = np.where(rng.random(games) < 0.15, rng.integers(0, 4, games), -1)
+        before = env.eat_count.copy()
+        food_before = env.food.copy()
+        reward, done = env.step(actions)
+        for i, state in enumerate(states):
+            action = DIRECTIONS[actions[i]] if actions[i] >= 0 else None
+            if not done[i]:
+                spawned = env.bonus_active[i] and env.eat_count[i] > before[i] and env.eat_count[i] % 5 == 0
+                state.rng.cells = [cell(env.bonus_food[i])] if spawned else []
+                if env.food[i] != food_before[i]:
+                    state.rng.cells.append(cell(env.food[i]))
+            else:
+                state.rng.cells = [(0, 0)] * 2  # The engine's last food is never compared
+            score = state.score
+            state.step(action)
+            if done[i]:
+                assert state.dead or state.won, (step, i, "engine still playing")
+                assert state.score == env.final_score[i], (step, i, state.score, env.final_score[i])
+                assert len(state.snake) == env.final_length[i], (step, i)
+                finished += 1
+                states[i] = new_state(i)
+                continue
+            assert state.score - score == reward[i], (step, i)
+            assert list(state.snake) == env.snake(i), (step, i, "snake")
+            assert state.food == cell(env.food[i]), (step, i, "food")
+            assert state.bonus_active == env.bonus_active[i], (step, i, "bonus")
+            if state.bonus_active:
+                assert state.bonus_food == cell(env.bonus_food[i]), (step, i, "bonus food")
+                assert state.bonus_remaining == env.bonus_remaining[i], (step, i, "bonus timer")
+    return finished
+
+
+def bench(games, steps, height, width, level):
+    env = BatchEnv(games, height, width, level, seed=1)
+    rng = np.random.default_rng(1)
+    actions = np.where(rng.random((steps, games)) < 0.15, rng.integers(0, 4, (steps, games)), -1)
+    started = time.perf_counter()
+    for step in range(steps):
+        env.step(actions[step])
+    elapsed = time.perf_counter() - started
+    return games * steps / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batched NumPy snake environment")
+    parser.add_argument("--parity", action="store_true", help="check the rules against engine.GameState")
+    parser.add_argument("--bench", type=int, metavar="GAMES", help="measure game steps per second")
+    parser.add_argument("--games", type=int, default=64)
+    parser.add_argument("--steps", type=int, default=5000)
+    parser.add_argument("--size", default="14x30", help="terminal size, HxW")
+    parser.add_argument("--level", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    height, width = (int(n) for n in args.size.split("x"))
+    if args.parity:
+        finished = parity(args.games, args.steps, height, width, args.level, args.seed)
+        print(f"parity ok: {args.games} games x {args.steps} steps, {finished} finished games")
+    if args.bench:
+        rate = bench(args.bench, 200, height, width, args.level)
+        print(f"{args.bench} games: {rate:,.0f} game steps/s")
@@ -0,0 +1,187 @@
+# benchmarks.py
+# Timings for the hot paths, run against a FrameBuffer so no terminal is needed.
+#   python benchmarks.py [--out FILE] [--baseline FILE --check NAME ... --threshold 1.25]
+# Results are saved as JSON; with --baseline the run fails (exit 1) when a
+# checked benchmark got slower than threshold x its baseline time.
+import argparse
+import curses
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import deque
+
+from board import Board
+from engine import GameState, RIGHT
+from targets import FrameBuffer
+from palette import get_color
+from render import Renderer
+from constants import DEFAULT_CONFIG
+import menu
+
+
+def timeit(func, number, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+# A state whose snake zig-zags over the top rows of a big board, with the
+# head at the start of an empty row so it can keep moving right for a while.
+def long_snake_state(length, width=400):
+    state = GameState(length // width + 6, width, 1, seed=1)
+    cells = []
+    for y in range(state.rows - 2):
+        xs = range(width) if y % 2 == 0 else range(width - 1, -1, -1)
+        cells.extend((y, x) for x in xs)
+    cells = cells[:length - 1]
+    cells.append((state.rows - 1, 0))
+    state.snake = deque(reversed(cells))
+    state.board = Board(state.rows, state.width)
+    for cell in state.snake:
+        state.board.occupy(*cell)
+    state.direction = RIGHT
+    state.food = (state.rows - 2, width - 1)
+    state.generation += 1
+    return state
+
+
+def bench_draw(results):
+    config = DEFAULT_CONFIG
+    for length in (10, 1000, 100000):
+        state = long_snake_state(length)
+        screen = FrameBuffer(state.height, state.width)
+        renderer = Renderer(screen, config)
+        renderer.draw(state, False)
+
+        def full():
+            renderer.invalidate()
+            renderer.draw(state, False)
+        results[f"draw.full.{length}"] = timeit(full, 3 if length > 1000 else 50)
+
+        def incremental():
+            state.step()
+            renderer.draw(state, False)
+        results[f"draw.incremental.{length}"] = timeit(incremental, 50)
+
+
+def bench_viewport(results):
+    # Board much bigger than the terminal: a frame should cost the same
+    # whatever the board size and snake length
+    config = DEFAULT_CONFIG
+    for length in (10, 200000):
+        state = long_snake_state(length, width=2000)
+        state.food = None
+        screen = FrameBuffer(50, 160)
+        renderer = Renderer(screen, config)
+        renderer.draw(state, False)
+
+        def full():
+            renderer.invalidate()
+            renderer.draw(state, False)
+        results[f"draw.viewport.full.{length}"] = timeit(full, 50)
+
+        def incremental():
+            state.step()
+            renderer.draw(state, False)
+        results[f"draw.viewport.incremental.{length}"] = timeit(incremental, 50)
+
+
+def bench_food(results):
+    rng = random.Random(1)
+    for fill in (0.1, 0.5, 0.9, 0.999):
+        board = Board(200, 300)
+        cells = [(y, x) for y in range(200) for x in range(300)]
+        rng.shuffle(cells)
+        for cell in cells[:int(len(cells) * fill)]:
+            board.occupy(*cell)
+        results[f"create_food.fill{fill}"] = timeit(lambda: board.random_free(rng), 10000)
+
+
+def bench_collision(results):
+    state = long_snake_state(100000)
+    board = state.board
+    head = state.snake[0]
+    results["collision.100k"] = timeit(lambda: board.occupied(*head), 100000)
+
+
+def bench_get_color(results):
+    config = DEFAULT_CONFIG
+    results["get_color"] = timeit(lambda: get_color(config, "snake"), 100000)
+
+
+def bench_menus(results):
+    config = {**DEFAULT_CONFIG}
+    presses = 50
+
+    def options():
+        keys = [curses.KEY_DOWN] * presses + [27]
+        menu.show_options_menu(FrameBuffer(40, 120, keys), config, lambda c: None, lambda c: None)
+    results["menu.options.per_key"] = timeit(options, 5) / (presses + 1)
+
+    def help_screen():
+        keys = [curses.KEY_DOWN] * presses + [27]
+        menu.show_help_screen(FrameBuffer(40, 120, keys), config)
+    results["menu.help.per_key"] = timeit(help_screen, 5) / (presses + 1)
+
+    def theme():
+        keys = [curses.KEY_RIGHT] * presses + [27]
+        menu.change_theme(FrameBuffer(40, 120, keys), config)
+    results["menu.theme.per_key"] = timeit(theme, 5) / (presses + 1)
+
+
+BENCHMARKS = [bench_draw, bench_viewport, bench_food, bench_collision, bench_get_color, bench_menus]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the snake hot paths")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", help="earlier results to compare against")
+    parser.add_argument("--check", action="append", default=[],
+                        help="benchmark that must not regress (repeatable, prefix match)")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="allowed slowdown factor against the baseline")
+    args = parser.parse_args()
+
+    results = {}
+    for bench in BENCHMARKS:
+        bench(results)
+    for name, seconds in results.items():
+        print(f"{name:<32}{seconds * 1e6:12.2f} us")
+
+    with open(args.out, "w") as f:
+        json.dump({"commit": git_commit(), "python": platform.python_version(),
+                   "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                   "results_us": {name: seconds * 1e6 for name, seconds in results.items()}}, f, indent=4)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results_us"]
+        failed = False
+        for name, seconds in results.items():
+            if name not in baseline or not any(name.startswith(check) for check in args.check):
+                continue
+            ratio = seconds * 1e6 / baseline[name]
+            if ratio > args.threshold:
+                print(f"REGRESSION {name}: {ratio:.2f}x slower than baseline")
+                failed = True
+        if failed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# board.py
+# Occupancy of the playfield: a byte per cell for constant-time collision
+# checks, plus an indexed set of free cells so food can be placed uniformly
+# in constant time however full the board is. With a level map (maps.py)
+# the walls start out occupied and never leave.
+from array import array
+from collections import deque
+from itertools import compress, repeat
+
+FREE_CELLS = bytes([1]) + bytes(255)  # cells.translate(FREE_CELLS): 1 where a cell is free
+
+
+class Board:
+    # `taken` is cell numbers to start out occupied (the snake of a restored
+    # save), set in bulk rather than one occupy() at a time
+    def __init__(self, rows, width, walls=None, taken=None):
+        self.rows = rows
+        self.width = width
+        self.walls = walls
+        if walls is not None:
+            # Prebuilt by the map compiler: walls are 2 in `cells` and sit
+            # past the free range in `free`
+            self.cells, self.free, self.slot, self.free_count = walls.board_arrays()
+            for cell in taken or ():
+                self.occupy(*divmod(cell, width))
+            return
+        size = rows * width
+        self.cells = bytearray(size)        # 1 where the snake is
+        self.free = array('i', range(size))  # free[:free_count] are the free cells
+        if taken is not None:
+            self.occupy_all(taken)
+            return
+        self.slot = array('i', range(size))  # index of each cell inside `free`
+        self.free_count = size
+
+    def occupy_all(self, taken):
+        # With `free` still in cell order, the occupied cells inside the free
+        # range (holes) trade places with as many free cells past it; a few
+        # C loops over `taken` instead of a swap-remove per cell
+        cells = self.cells
+        deque(map(cells.__setitem__, taken, repeat(1)), 0)
+        count = cells.count(0)
+        holes = array('i', compress(taken, map(count.__gt__, taken)))
+        fillers = array('i', compress(range(count, len(cells)), cells[count:].translate(FREE_CELLS)))
+        if len(holes) != len(fillers):
+            raise ValueError("a cell taken twice")
+        free = self.free
+        deque(map(free.__setitem__, holes, fillers), 0)
+        deque(map(free.__setitem__, fillers, holes), 0)
+        self.slot = free[:]  # Only pairs swapped: `free` is its own inverse
+        self.free_count = count
+
+    def occupied(self, y, x):
+        return self.cells[y * self.width + x]
+
+    def occupy(self, y, x):
+        cell = y * self.width + x
+        if self.cells[cell]:
+            return
+        self.cells[cell] = 1
+        # Swap-remove: move the last free cell into this cell's slot
+        last = self.free_count - 1
+        i = self.slot[cell]
+        moved = self.free[last]
+        self.free[i] = moved
+        self.slot[moved] = i
+        self.free[last] = cell
+        self.slot[cell] = last
+        self.free_count = last
+
+    def release(self, y, x):
+        if y >= self.rows or x >= self.width:  # Left behind by a resize
+            return
+        cell = y * self.width + x
+        if not self.cells[cell]:
+            return
+        self.cells[cell] = 0
+        # Swap the cell back to the end of the free range and grow it
+        first = self.free_count
+        i = self.slot[cell]
+        moved = self.free[first]
+        self.free[i] = moved
+        self.slot[moved] = i
+        self.free[first] = cell
+        self.slot[cell] = first
+        self.free_count = first + 1
+
+    def random_free(self, rng):
+        if not self.free_count:
+            return None  # Board full
+        cell = self.free[rng.randrange(self.free_count)]
+        return divmod(cell, self.width)
@@ -1,8 +1,32 @@
 # constants.py
-import curses
-
 CONFIG_FILE = "snake_config.json"
 
+# Same values as curses.COLOR_*, so building the defaults doesn't need curses
+COLOR_BLACK = 0
+COLOR_RED = 1
+COLOR_GREEN = 2
+COLOR_YELLOW = 3
+COLOR_BLUE = 4
+COLOR_MAGENTA = 5
+COLOR_CYAN = 6
+COLOR_WHITE = 7
+
+def default_theme():
+    return {
+        "snake": (COLOR_GREEN, COLOR_BLACK),
+        "food": (COLOR_RED, COLOR_BLACK),
+        "wall": (COLOR_WHITE, COLOR_BLACK),
+        "text": (COLOR_WHITE, COLOR_BLACK),
+        "menu": (COLOR_CYAN, COLOR_BLACK),
+        "highlight": (COLOR_BLACK, COLOR_CYAN),
+        "quit": (COLOR_RED, COLOR_BLACK),
+        "option": (COLOR_YELLOW, COLOR_BLACK),
+        "score": (COLOR_WHITE, COLOR_BLACK),
+        "bonus_timer": (COLOR_BLUE, COLOR_BLACK),
+        "bonus_food": (COLOR_MAGENTA, COLOR_BLACK),
+        "border": (COLOR_WHITE, COLOR_BLACK),
+    }
+
 DEFAULT_CONFIG = {
     "level": 1,
     "theme": "Default",
@@ -11,64 +35,28 @@ DEFAULT_CONFIG = {
     "wall_char": "#",
     "empty_char": " ",
     "sound_enabled": True,  # Add sound setting
-    "colors": {
-        "Default": {
-            "snake": (curses.COLOR_GREEN, curses.COLOR_BLACK),
-            "food": (curses.COLOR_RED, curses.COLOR_BLACK),
-            "wall": (curses.COLOR_WHITE, curses.COLOR_BLACK),
-            "text": (curses.COLOR_WHITE, curses.COLOR_BLACK),
-            "menu": (curses.COLOR_CYAN, curses.COLOR_BLACK),
-            "highlight": (curses.COLOR_BLACK, curses.COLOR_CYAN),
-            "quit": (curses.COLOR_RED, curses.COLOR_BLACK),
-            "option": (curses.COLOR_YELLOW, curses.COLOR_BLACK),
-            "score": (curses.COLOR_WHITE, curses.COLOR_BLACK),
-            "bonus_timer": (curses.COLOR_BLUE, curses.COLOR_BLACK),
-            "bonus_food": (curses.COLOR_MAGENTA, curses.COLOR_BLACK),
-            "border": (curses.COLOR_WHITE, curses.COLOR_BLACK),
-        },
-        "dark": {  # Make sure all themes have all elements
-           "snake": (curses.COLOR_GREEN, curses.COLOR_BLACK),
-            "food": (curses.COLOR_RED, curses.COLOR_BLACK),
-            "wall": (curses.COLOR_WHITE, curses.COLOR_BLACK),
-            "text": (curses.COLOR_WHITE, curses.COLOR_BLACK),
-            "menu": (curses.COLOR_CYAN, curses.COLOR_BLACK),
-            "highlight": (curses.COLOR_BLACK, curses.COLOR_CYAN),
-            "quit": (curses.COLOR_RED, curses.COLOR_BLACK),
-            "option": (curses.COLOR_YELLOW, curses.COLOR_BLACK),
-            "score": (curses.COLOR_WHITE, curses.COLOR_BLACK),
-            "bonus_timer": (curses.COLOR_BLUE, curses.COLOR_BLACK),
-            "bonus_food": (curses.COLOR_MAGENTA, curses.COLOR_BLACK),
-            "border": (curses.COLOR_WHITE, curses.COLOR_BLACK),
-        },
-        "light": {
-            "snake": (curses.COLOR_GREEN, curses.COLOR_BLACK),
-            "food": (curses.COLOR_RED, curses.COLOR_BLACK),
-            "wall": (curses.COLOR_WHITE, curses.COLOR_BLACK),
-            "text": (curses.COLOR_WHITE, curses.COLOR_BLACK),
-            "menu": (curses.COLOR_CYAN, curses.COLOR_BLACK),
-            "highlight": (curses.COLOR_BLACK, curses.COLOR_CYAN),
-            "quit": (curses.COLOR_RED, curses.COLOR_BLACK),
-            "option": (curses.COLOR_YELLOW, curses.COLOR_BLACK),
-            "score": (curses.COLOR_WHITE, curses.COLOR_BLACK),
-            "bonus_timer": (curses.COLOR_BLUE, curses.COLOR_BLACK),
-            "bonus_food": (curses.COLOR_MAGENTA, curses.COLOR_BLACK),
-            "border": (curses.COLOR_WHITE, curses.COLOR_BLACK),
-        }
+    "save_file": "snake_save.bin",  # Game kept for "Resume"
+    "autosave_ticks": 600,  # 0 saves only on pause and quit
+    "record_replays": True,  # Save every game to replay_dir
+    "replay_dir": "replays",
+    "audio_backend": "auto",  # auto, simpleaudio, winsound, command, null or file:<path.wav>
+    "input_queue_depth": 3,  # Turns buffered between ticks
+    "input_drop_policy": "newest",  # "newest" or "oldest" when the queue is full
+    "autopilot": False,  # The computer plays (demos, soak tests)
+    "board_rows": 0,  # Playfield size; 0 fits the terminal, more scrolls with the head
+    "board_columns": 0,
+    "map": "",  # Level map (text, see maps.py); sets the board size. Empty: open board
+    "perf_hud": False,  # Frame rate and frame times next to the score
+    "perf_log": "",  # Per-frame phase timings to this .csv or .jsonl file
+    "scores_file": "scores.db",  # Leaderboard (SQLite); empty turns it off
+    "cabinet_name": "",  # Names this machine's results when boards are merged; empty uses the host name
+    "remote_play": "off",  # Adapt drawing to a slow link (remote.py): "off", "on", or "auto" (over SSH)
+    "colors": {  # Make sure all themes have all elements
+        "Default": default_theme(),
+        "dark": default_theme(),
+        "light": default_theme(),
     },
-    "custom_colors": { # Make sure all themes have all elements
-       "snake": (curses.COLOR_GREEN, curses.COLOR_BLACK),
-        "food": (curses.COLOR_RED, curses.COLOR_BLACK),
-        "wall": (curses.COLOR_WHITE, curses.COLOR_BLACK),
-        "text": (curses.COLOR_WHITE, curses.COLOR_BLACK),
-        "menu": (curses.COLOR_CYAN, curses.COLOR_BLACK),
-        "highlight": (curses.COLOR_BLACK, curses.COLOR_CYAN),
-        "quit": (curses.COLOR_RED, curses.COLOR_BLACK),
-        "option": (curses.COLOR_YELLOW, curses.COLOR_BLACK),
-        "score": (curses.COLOR_WHITE, curses.COLOR_BLACK),
-        "bonus_timer": (curses.COLOR_BLUE, curses.COLOR_BLACK),
-        "bonus_food": (curses.COLOR_MAGENTA, curses.COLOR_BLACK),
-        "border": (curses.COLOR_WHITE, curses.COLOR_BLACK),
-    }
+    "custom_colors": default_theme(),
 }
 
 SNAKE_ART = [
@@ -0,0 +1,179 @@
+# engine.py
+# Curses-free game rules. main() drives a GameState one tick at a time; the
+# same object can be stepped headlessly as fast as Python allows.
+import random
+import time
+from collections import deque
+
+from board import Board
+
+LEVEL_SPEEDS = [150, 150, 120, 120, 100, 100, 80, 80]  # Milliseconds per tick
+
+# --- Directions ---
+UP = "up"
+DOWN = "down"
+LEFT = "left"
+RIGHT = "right"
+
+MOVES = {UP: (-1, 0), DOWN: (1, 0), LEFT: (0, -1), RIGHT: (0, 1)}
+OPPOSITE = {UP: DOWN, DOWN: UP, LEFT: RIGHT, RIGHT: LEFT}
+
+# --- Step results ---
+EAT = "eat"
+BONUS = "bonus"
+DEAD = "dead"
+WIN = "win"  # No free cell left for food
+
+
+def tick_seconds(level):
+    return LEVEL_SPEEDS[level - 1] / 1000.0
+
+
+# Uniform over the free cells, or None when the snake fills the board
+def create_food(board, rng):
+    return board.random_free(rng)
+
+
+class GameState:
+    # height/width are the terminal dimensions, like in main(); the bottom
+    # two rows are reserved for the border and the status line. `walls` is
+    # a maps.Map of the same size, or None for an open board. `saved` is the
+    # (snake, board) of a game in progress; savegame.restore() sets the rest.
+    def __init__(self, height, width, level=1, seed=None, walls=None, saved=None):
+        self.height = height
+        self.width = width
+        self.rows = height - 2
+        self.level = level
+        self.walls = walls
+        self.generation = 0  # Bumped whenever the board is rebuilt
+        self.pushes = 0      # Head moves so far, for incremental rendering
+        self.damage = None   # Set of vacated cells, when a renderer asks for it
+        self.timer = None    # perf.Perf, when main() times the loop phases
+        self.reset(seed, saved)
+
+    # Every game gets its own seed so it can be replayed on its own
+    def reset(self, seed=None, saved=None):
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        self.generation += 1
+        if saved:
+            self.snake, self.board = saved
+        else:
+            if self.walls:
+                y, x = self.walls.spawn
+                self.snake = deque([(y, x), (y, (x - 1) % self.width)])  # The map made room for it
+            else:
+                y, x = self.height // 2, self.width // 2
+                self.snake = deque([(y, x), (y, x - 1)])  # Head first
+            self.board = Board(self.rows, self.width, self.walls)
+            for segment in self.snake:
+                self.board.occupy(*segment)
+        self.direction = RIGHT
+        self.score = 0
+        self.eat_count = 0
+        self.tick = 0
+        self.bonus_active = False
+        self.bonus_food = None
+        self.bonus_duration = 0
+        self.bonus_remaining = 0
+        self.dead = False
+        self.won = False
+        self.food = self.place_food()
+
+    def resize(self, height, width):
+        self.height = height
+        self.width = width
+        self.rows = height - 2
+        self.generation += 1
+        if self.walls and (self.rows, self.width) != (self.walls.rows, self.walls.width):
+            self.walls = None  # A map only fits its own size
+        self.board = Board(self.rows, self.width, self.walls)
+        for y, x in self.snake:
+            if y < self.rows and x < self.width:
+                self.board.occupy(y, x)
+        if self.food and (self.food[0] >= self.rows or self.food[1] >= self.width):
+            self.food = self.place_food()
+        if self.bonus_food and (self.bonus_food[0] >= self.rows or self.bonus_food[1] >= self.width):
+            self.bonus_food = self.place_food()
+            self.bonus_active = self.bonus_food is not None
+
+    # Advance the game by one tick. `action` is a direction or None to keep
+    # going straight. Returns EAT, BONUS, DEAD, WIN or None. A move onto a
+    # cell holding both the bonus and the food scores both and returns BONUS.
+    def step(self, action=None):
+        if self.dead:
+            return DEAD
+        if self.won:
+            return WIN
+        if action in MOVES and action != OPPOSITE[self.direction]:
+            self.direction = action
+        self.tick += 1
+        if self.bonus_active:
+            self.bonus_remaining -= tick_seconds(self.level)
+
+        dy, dx = MOVES[self.direction]
+        head = self.snake[0]
+        new_head = ((head[0] + dy) % self.rows, (head[1] + dx) % self.width)
+
+        # --- Self-collision ---
+        if self.board.occupied(*new_head):
+            self.dead = True
+            return DEAD
+
+        self.snake.appendleft(new_head)
+        self.board.occupy(*new_head)
+        self.pushes += 1
+        event = None
+        ate = new_head == self.food
+
+        # When the bonus ends the food moves, unless it's being eaten anyway
+        if self.bonus_active:
+            if new_head == self.bonus_food:
+                time_taken = self.bonus_duration - self.bonus_remaining
+                bonus_multiplier = max(0, int((self.bonus_duration - time_taken) * self.level))
+                self.score += 10 * bonus_multiplier
+                self.bonus_active = False
+                self.bonus_food = None
+                if not ate:
+                    self.mark(self.food)
+                    self.food = self.place_food()
+                event = BONUS
+            elif self.bonus_remaining < 0:
+                self.bonus_active = False
+                self.mark(self.bonus_food)
+                self.bonus_food = None
+                if not ate:
+                    self.mark(self.food)
+                    self.food = self.place_food()
+
+        if ate:
+            self.score += self.level
+            self.eat_count += 1
+            if self.eat_count % 5 == 0:
+                self.bonus_food = self.place_food()
+                self.bonus_active = self.bonus_food is not None
+                self.bonus_duration = self.width * 0.15 * (9 - self.level)
+                self.bonus_remaining = self.bonus_duration
+            self.food = self.place_food()
+            event = event or EAT
+        elif not self.bonus_active:
+            tail = self.snake.pop()
+            self.board.release(*tail)
+            self.mark(tail)
+
+        if self.food is None:
+            self.won = True
+            return WIN
+        return event
+
+    def place_food(self):
+        if self.timer is None:
+            return create_food(self.board, self.rng)
+        started = time.perf_counter()
+        food = create_food(self.board, self.rng)
+        self.timer.add("food", started)
+        return food
+
+    def mark(self, cell):
+        if self.damage is not None and cell is not None:
+            self.damage.add(cell)
@@ -1,176 +1,144 @@
 # main.py
-import curses
-import random
 import time
-import json
+STARTED = time.perf_counter()  # Start of the "imports" phase for --profile-startup
 import os
-import winsound  # For Windows sound
-from constants import SNAKE_SEGMENTS, DEFAULT_CONFIG, CONFIG_FILE, SNAKE_ART, FOOD_CHAR, BONUS_FOOD_CHAR, HORIZONTAL_BORDER_CHAR, VERTICAL_BORDER_CHAR
-from menu import show_options_menu, show_help_screen  # For menu interactions
+import sys
+import curses
+from constants import SNAKE_ART
+import settings
+from menu import show_options_menu, show_help_screen, safe_addstr  # For menu interactions
+from engine import GameState, tick_seconds, UP, DOWN, LEFT, RIGHT, EAT, BONUS, DEAD, WIN
+from scheduler import FixedStep
+from turnqueue import TurnQueue
+from render import Renderer
+from palette import get_color, build as init_colors
+from targets import CursesTarget
+
+# Keys that steer the snake, mapped to engine directions
+KEY_DIRECTIONS = {
+    curses.KEY_UP: UP, ord('w'): UP, ord('W'): UP,
+    curses.KEY_DOWN: DOWN, ord('s'): DOWN, ord('S'): DOWN,
+    curses.KEY_LEFT: LEFT, ord('a'): LEFT, ord('A'): LEFT,
+    curses.KEY_RIGHT: RIGHT, ord('d'): RIGHT, ord('D'): RIGHT,
+}
+
+# Audio, replays and saves aren't needed for the first frame; they are
+# imported when a game starts.
+def start_recording(config, state):
+    from replay import new_recording
+    if not config["record_replays"]:
+        return None
+    try:
+        return new_recording(config["replay_dir"], state)
+    except OSError:
+        return None  # Read-only directory etc.: play without recording
+
+def save_game(config, state, snapshotter):
+    import savegame
+    try:
+        savegame.save(config["save_file"], state, snapshotter)
+    except OSError:
+        pass
 
-# --- Utility Functions (within main.py) ---
-def safe_addstr(stdscr, y, x, text, color=None):
-    height, width = stdscr.getmaxyx()
-    if 0 <= y < height and 0 <= x < width:
-        try:
-            if color:
-                stdscr.addstr(y, x, text, color)
-            else:
-                stdscr.addstr(y, x, text)
-        except curses.error:
-            pass
+# GameState dimensions for this terminal: the terminal itself, or the
+# configured board or map (plus the two status rows, like the terminal)
+def board_size(config, height, width, walls=None):
+    if walls:
+        return walls.rows + 2, walls.width
+    return (config["board_rows"] + 2 if config["board_rows"] else height,
+            config["board_columns"] or width)
+
+def virtual_board(config, walls=None):
+    return bool(walls or config["board_rows"] or config["board_columns"])
+
+def load_map(config):
+    if not config["map"]:
+        return None
+    import maps
+    try:
+        return maps.load(config["map"])
+    except (OSError, ValueError):
+        return None  # Missing or broken map: play on an open board
+
+def load_game(config, height, width, walls=None):
+    import savegame
+    try:
+        state = savegame.load(config["save_file"], walls)
+    except (OSError, ValueError, KeyError):
+        return None  # No save, one from an older version or from another map
+    if (state.height, state.width) != (height, width):
+        if walls:
+            return None
+        state.resize(height, width)
+    return state
+
+def start_perf(config):
+    if not (config["perf_hud"] or config["perf_log"]):
+        return None
+    from perf import Perf
+    try:
+        return Perf(config["perf_log"] or None)
+    except OSError:
+        return Perf()  # Can't write the log: keep the HUD
+
+def start_scores(config):
+    if not config["scores_file"]:
+        return None
+    from scores import ScoreStore
+    return ScoreStore(config["scores_file"], config["cabinet_name"])
+
+def start_remote(config, screen, forced):
+    mode = config["remote_play"]
+    if not (forced or mode == "on" or mode == "auto" and os.environ.get("SSH_CONNECTION")):
+        return None
+    from remote import RemoteTarget
+    screen.refresh()  # curses clears the screen on the first getch() unless it has drawn once
+    return RemoteTarget(keys=screen)
+
+def close_remote(remote):
+    # The session's throughput, printed once curses is gone
+    if remote is None:
+        return None
+    remote.close()
+    return remote.report()
+
+def start_autopilot(config):
+    if not config["autopilot"]:
+        return None
+    from autopilot import Autopilot
+    return Autopilot()
 
+# --- Utility Functions (within main.py) ---
 def load_config():
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, "r") as f:
-                config = json.load(f)
-                for key, default_value in DEFAULT_CONFIG.items():
-                    if key not in config:
-                        config[key] = default_value
-                    if isinstance(default_value, dict):
-                        for sub_key, sub_default_value in default_value.items():
-                            if sub_key not in config[key]:
-                                config[key][sub_key] = sub_default_value
-                return config
-        except json.JSONDecodeError:
-            print("Error: Invalid config file.  Using default settings.")
-            return DEFAULT_CONFIG
-    else:
-        return DEFAULT_CONFIG
-
+    return settings.load()
 
 def save_config(config):
-    with open(CONFIG_FILE, "w") as f:
-        json.dump(config, f, indent=4)
-
-def init_colors(config):
-    curses.start_color()
-    theme = config["theme"]
-    color_data = config["colors"].get(theme, config["colors"]["Default"])
-    for name, (fg, bg) in color_data.items():
-        curses.init_pair(list(color_data.keys()).index(name) + 1, fg, bg)
-
-def get_color(config, element):
-    theme = config["theme"]
-    color_data = config["colors"].get(theme, config["colors"]["Default"])
-    if element not in color_data:
-        return curses.COLOR_WHITE | curses.COLOR_BLACK
-    color_index = list(color_data.keys()).index(element) + 1
-    return curses.color_pair(color_index)
-# --- End of Utility Functions ---
-
-def display_game_ui(stdscr, score, config, width, paused):
-    score_str = f"{score:04}"
-    safe_addstr(stdscr, curses.LINES - 1, 1, score_str, get_color(config, "score"))
-    menu_str = "M Menu"
-    menu_x = width - len(menu_str) - 2
-    safe_addstr(stdscr, curses.LINES - 1, menu_x, menu_str, get_color(config, "option"))
-
-def draw_bonus_timer(stdscr, remaining_time, total_time, config, width):
-    timer_width = width - 4
-    filled_width = int(timer_width * (remaining_time / total_time))
-    empty_width = timer_width - filled_width
-    timer_y = curses.LINES - 2  # Adjusted position
-    timer_str = "█" * filled_width + "░" * empty_width  # Use ░█ and ░
-    safe_addstr(stdscr, timer_y, 2, timer_str, get_color(config, "bonus_timer"))
-
-def get_snake_segment(prev_segment, current_segment, next_segment):
-    px, py = prev_segment
-    cx, cy = current_segment
-    nx, ny = next_segment
-
-    if px == cx == nx: return SNAKE_SEGMENTS["vertical"]    # Vertical
-    if py == cy == ny: return SNAKE_SEGMENTS["horizontal"]  # Horizontal
-
-    # Corners (curvy)
-    if (cx > px and cy < ny) or (cx < nx and cy > py): return SNAKE_SEGMENTS["bottom_left"]
-    if (cx > px and cy > ny) or (cx < nx and cy < py): return SNAKE_SEGMENTS["top_left"]
-    if (cx < px and cy < ny) or (cx > nx and cy > py):  return SNAKE_SEGMENTS["bottom_right"]
-    if (cx < px and cy > ny) or (cx > nx and cy < py): return SNAKE_SEGMENTS["top_right"]
-
-    return "O"  # Fallback
-
-def get_snake_head(direction):
-      # More distinct head shapes
-    if direction == curses.KEY_UP:    return "Λ"
-    elif direction == curses.KEY_DOWN:  return "V"
-    elif direction == curses.KEY_LEFT:  return "<"
-    elif direction == curses.KEY_RIGHT: return ">"
-    return "O"
-
-def get_snake_tail(tail, second_last):
-    tx, ty = tail
-    sx, sy = second_last
-    # Pointed tail
-    if ty < sy:   return SNAKE_SEGMENTS["tail_left"]
-    elif ty > sy: return SNAKE_SEGMENTS["tail_right"]
-    elif tx < sx: return SNAKE_SEGMENTS["tail_up"]
-    elif tx > sx: return SNAKE_SEGMENTS["tail_down"]
-    return "o"
-
-def create_food(snake, height, width, config, bonus_active=False):
-    while True:
-        food = [random.randint(0, height - 3), random.randint(0, width - 1)]
-        if food not in snake:
-            return food
-
-def draw(stdscr, snake, food, bonus_food, bonus_active, score, config, paused, bonus_duration, bonus_start_time, direction, new_head):
-    stdscr.clear()
-    height, width = stdscr.getmaxyx()
-
-    for i, segment in enumerate(snake):
-        if i == 0:
-            segment_char = get_snake_head(direction)
-        elif i == len(snake) - 1:
-            segment_char = get_snake_tail(snake[-1], snake[-2])
-        else:
-            prev_segment = snake[i - 1]
-            next_segment = snake[i + 1]
-            segment_char = get_snake_segment(prev_segment, segment, next_segment)
-        safe_addstr(stdscr, segment[0], segment[1], segment_char, get_color(config, "snake"))
+    settings.save(config)
 
-    if bonus_active and bonus_food:
-        safe_addstr(stdscr, bonus_food[0], bonus_food[1], BONUS_FOOD_CHAR, get_color(config, "bonus_food"))
-    if not bonus_active or (bonus_active and new_head != food):
-        safe_addstr(stdscr, food[0], food[1], FOOD_CHAR, get_color(config, "food"))
-
-    # --- Single-line border ABOVE the score/status line ---
-    border_y = height - 2
-    for x in range(width):
-        safe_addstr(stdscr, border_y, x, HORIZONTAL_BORDER_CHAR, get_color(config, "border"))
-
-    safe_addstr(stdscr, height - 1, 0, " " * width, get_color(config, 'score'))
-    display_game_ui(stdscr, score, config, width, paused)
-
-    # --- Bonus Timer BELOW border ---
-    if bonus_active:
-        remaining_time = bonus_duration - (time.time() - bonus_start_time)
-        draw_bonus_timer(stdscr, remaining_time, bonus_duration, config, width)
-
-    if paused:
-        pause_message = "PAUSED"
-        safe_addstr(stdscr, height // 2, (width - len(pause_message)) // 2, pause_message, get_color(config, "menu") | curses.A_BOLD)
-
-    stdscr.refresh()
+# --- End of Utility Functions ---
 
-def game_over_screen(stdscr, score):
+def game_over_screen(stdscr, score, won=False, best=None):
     height, width = stdscr.getmaxyx()
-    message1 = "Game Over!"
+    message1 = "You Win!" if won else "Game Over!"
     message2 = f"Your Score: {score:04}"
     message3 = "Press any key to restart, or Q to quit"
     stdscr.clear()
     safe_addstr(stdscr, height // 2 - 2, (width - len(message1)) // 2, message1, curses.A_BOLD)
     safe_addstr(stdscr, height // 2 - 1, (width - len(message2)) // 2, message2)
     safe_addstr(stdscr, height // 2, (width - len(message3)) // 2, message3)
+    if best is not None:  # Best earlier score at this level
+        message4 = "New best!" if score > best else f"Best: {best:04}"
+        safe_addstr(stdscr, height // 2 + 2, (width - len(message4)) // 2, message4)
     stdscr.refresh()
+    curses.flushinp()  # Don't let a steering key pressed at death restart the game
+    stdscr.timeout(-1)
     while True:
         key = stdscr.getch()
         if key == ord('q') or key == ord('Q'):
             return False
         else:
             return True
-def welcome_screen(stdscr, config):
+def welcome_screen(stdscr, config, profile=None):
     height, width = stdscr.getmaxyx()
     stdscr.clear()
 
@@ -209,6 +177,9 @@ def welcome_screen(stdscr, config):
                 safe_addstr(stdscr, y, x, option, get_color(config, "menu"))
 
         stdscr.refresh()
+        if profile is not None:  # --profile-startup stops at the first frame
+            profile.mark("welcome render")
+            return "quit"
         key = stdscr.getch()
 
         if key == curses.KEY_UP or key == ord('w') or key == ord('W'):
@@ -229,60 +200,109 @@ def welcome_screen(stdscr, config):
         elif key == ord('q') or key == ord('Q'):
             return "quit"
 
-def main(stdscr):
+def main(stdscr, profile=None, spectators=None, remote=False):
     curses.curs_set(0)
-    stdscr.nodelay(1)
-    stdscr.timeout(100)
+    screen = CursesTarget(stdscr)  # All drawing goes through the target
+    if profile: profile.mark("curses init")
 
     config = load_config()
+    if profile: profile.mark("config")
+    remote = start_remote(config, screen, remote)
+    if remote:
+        screen = remote  # Frames go out as ANSI on a writer thread; curses only reads keys
+    if spectators is not None:
+        from spectate import TeeTarget
+        screen = TeeTarget(screen, spectators)
+    screen.nodelay(1)
+    screen.timeout(-1)
     init_colors(config)
+    if profile: profile.mark("color init")
 
     # --- Welcome Screen ---
-    choice = welcome_screen(stdscr, config)
-    if choice == -1:  # Quit
-        return
-    elif choice == 0:  # Resume Saved Game (Placeholder)
-        # In a real game, you would load game state here.
-        pass
+    choice = welcome_screen(screen, config, profile)
+    if choice == "quit":
+        return close_remote(remote)
+    elif choice == "menu":
+        if show_options_menu(screen, config, init_colors, save_config) == "quit":
+            return close_remote(remote)
     # --- End Welcome Screen ---
-    height, width = stdscr.getmaxyx()
-    snake = [[height // 2, width // 2], [height // 2, width // 2 -1]] # start with head and tail
-    direction = curses.KEY_RIGHT
-    food = create_food(snake, height, width, config)
-    score = 0
-    level_speeds = [150, 150, 120, 120, 100, 100, 80, 80]  # Consistent speed
-    eat_count = 0
-    bonus_active = False
-    bonus_food = None
-    bonus_start_time = 0
-    bonus_duration = 0
+    walls = load_map(config)
+    height, width = board_size(config, *screen.getmaxyx(), walls)
+    state = load_game(config, height, width, walls) if choice == "resume" else None
+    resumed = state is not None
+    if not resumed:
+        state = GameState(height, width, config["level"], walls=walls)
+    import savegame
+    from audio import Audio
+    snapshotter = savegame.Snapshotter()
+    perf = start_perf(config)
+    if perf:
+        screen = perf.wrap(screen)
+        state.timer = perf  # Times food placement inside step()
+    renderer = Renderer(screen, config)
+    scheduler = FixedStep(tick_seconds(state.level))
+    turns = TurnQueue(config["input_queue_depth"], config["input_drop_policy"])
+    audio = Audio(config, config["audio_backend"])
+    recorder = None if resumed else start_recording(config, state)  # A replay needs the game from its start
+    pilot = start_autopilot(config)
+    scores = start_scores(config)
+    game_started = time.monotonic()
     paused = False
-    new_head = [height // 2, width // 2] # Initialize
-    stdscr.timeout(level_speeds[config["level"] -1]) # Setting up a constent speed.
+    renderer.draw(state, paused)
 
     while True:
-        key = stdscr.getch()
+        # --- Input: wait at most until the next tick is due (paused: for a key) ---
+        screen.timeout(-1 if paused else scheduler.wait_ms())
+        if perf: started = time.perf_counter()
+        key = screen.getch()
+        if perf: perf.add("wait", started)
+        # Drain every steering key already waiting, not just one per tick
+        screen.timeout(0)
+        while key in KEY_DIRECTIONS:
+            if not paused and pilot is None:
+                turns.push(KEY_DIRECTIONS[key], state.direction)
+            key = screen.getch()
         if key == curses.KEY_RESIZE:
-            curses.resizeterm(*stdscr.getmaxyx())
-            height, width = stdscr.getmaxyx()
-            draw(stdscr, snake, food, bonus_food, bonus_active, score, config, paused, bonus_duration, bonus_start_time, direction, new_head)
+            curses.resizeterm(*screen.getmaxyx())
+            if not virtual_board(config, walls):  # A bigger board keeps its size; only the view changes
+                height, width = screen.getmaxyx()
+                state.resize(height, width)
+                if recorder: recorder.resize(state.tick, height, width)
+            renderer.invalidate()
+            renderer.draw(state, paused)
             continue
 
         # --- Pause/Resume (F, ESC) ---
         if key == ord('p') or key == ord('P') or key == ord(' ') or key == 27:
             paused = not paused
+            if paused:
+                save_game(config, state, snapshotter)
+            scheduler.reset()
+            renderer.draw(state, paused)
+            continue
 
         # --- Menu (M, O) - Works even when paused ---
         if key == ord('m') or key == ord('M') or key == ord('o') or key == ord('O'):
-                option_result = show_options_menu(stdscr, config, init_colors, save_config)
+                screen.timeout(-1)
+                theme = config["theme"]
+                option_result = show_options_menu(screen.overlay(), config, init_colors, save_config)
+                if recorder and state.level != config["level"]:
+                    recorder.level(state.tick, config["level"])
+                state.level = config["level"]
+                scheduler.set_interval(tick_seconds(config["level"]))
+                pilot = start_autopilot(config)
                 if option_result == "new_game":
-                    snake = [[height // 2, width // 2],[height//2, width//2 -1]]; direction = curses.KEY_RIGHT; food = create_food(snake, height, width, config); score = 0;  eat_count = 0; bonus_active = False; bonus_food = None; paused = True
-                    stdscr.timeout(level_speeds[config["level"] - 1]) # Consistent speed.
-                    draw(stdscr, snake, food, bonus_food, bonus_active, score, config, paused, bonus_duration, bonus_start_time, direction, new_head)
-                    continue
+                    if recorder: recorder.close(state.tick)
+                    state.reset(); paused = True
+                    turns.clear()
+                    recorder = start_recording(config, state)
+                    game_started = time.monotonic()
                 elif option_result == "quit":
                     break
-                draw(stdscr, snake, food, bonus_food, bonus_active, score, config, paused, bonus_duration, bonus_start_time, direction, new_head)
+                # The game frame is still under the menu unless it changed
+                if option_result == "new_game" or config["theme"] != theme or not screen.restore():
+                    renderer.invalidate()
+                renderer.draw(state, paused)
                 continue
         # --- Quit (Q) ---
         if key == ord('q') or key == ord('Q'):  # Allow quitting anytime
@@ -290,80 +310,109 @@ def main(stdscr):
 
         # --- Help Screen (H) ---
         if key == ord('h') or key == ord('H'):
-            show_help_screen(stdscr, config)
-            draw(stdscr, snake, food, bonus_food, bonus_active, score, config, paused, bonus_duration, bonus_start_time, direction, new_head)
+            screen.timeout(-1)
+            show_help_screen(screen.overlay(), config)
+            scheduler.reset()
+            if not screen.restore():
+                renderer.invalidate()
+            renderer.draw(state, paused)
             continue
 
         # --- Game Logic (only if not paused) ---
-        if not paused:
-            # --- Movement ---
-            if key == curses.KEY_UP or key in (ord('w'), ord('W')):
-                if direction != curses.KEY_DOWN: direction = curses.KEY_UP
-            elif key == curses.KEY_DOWN or key in (ord('s'), ord('S')):
-                if direction != curses.KEY_UP: direction = curses.KEY_DOWN
-            elif key == curses.KEY_LEFT or key in (ord('a'), ord('A')):
-                if direction != curses.KEY_RIGHT: direction = curses.KEY_LEFT
-            elif key == curses.KEY_RIGHT or key in (ord('d'), ord('D')):
-                if direction != curses.KEY_LEFT: direction = curses.KEY_RIGHT
-
-            new_head = [snake[0][0], snake[0][1]]
-            if      direction == curses.KEY_UP:    new_head[0] -= 1
-            elif direction == curses.KEY_DOWN:  new_head[0] += 1
-            elif direction == curses.KEY_LEFT:  new_head[1] -= 1
-            elif direction == curses.KEY_RIGHT: new_head[1] += 1
-
-            new_head[0] = new_head[0] % (height - 2)
-            new_head[1] = new_head[1] % width
-
-            # --- Game Over: Self-Collision ---
-            if new_head in snake:
-                if game_over_screen(stdscr, score):
-                    snake = [[height // 2, width // 2],[height//2, width//2 -1]]; direction = curses.KEY_RIGHT; food = create_food(snake, height, width, config); score = 0;  eat_count = 0; bonus_active = False; bonus_food = None; paused = False
-                    stdscr.timeout(level_speeds[config["level"] - 1])
-                    draw(stdscr, snake, food, bonus_food, bonus_active, score, config, paused, bonus_duration, bonus_start_time, direction, new_head)
-                    continue
-                else:
-                    break # Quit
-
-            snake.insert(0, new_head)
-
-            if bonus_active:
-                if new_head == bonus_food:
-                    time_taken = time.time() - bonus_start_time
-                    bonus_multiplier = max(0, int((bonus_duration - time_taken) * config["level"]))
-                    score += 10 * bonus_multiplier
-                    bonus_active = False
-                    bonus_food = None
-                    food = create_food(snake, height, width, config)
-                    try:  # --- Sound: Bonus ---
-                        winsound.PlaySound("bonus.wav", winsound.SND_ASYNC)
-                    except:
-                        pass
-                elif time.time() - bonus_start_time > bonus_duration:
-                    bonus_active = False
-                    bonus_food = None
-                    food = create_food(snake, height, width, config)
-
-            if new_head == food:
-                score += config["level"]
-                eat_count += 1
-                if eat_count % 5 == 0:
-                    bonus_active = True
-                    bonus_food = create_food(snake, height, width, config, bonus_active=True)
-                    bonus_start_time = time.time()
-                    bonus_duration = width * 0.15 * (9 - config["level"])
-                    food = create_food(snake, height, width, config)
-                else:
-                    food = create_food(snake, height, width, config)
-                try:  # --- Sound: Eat ---
-                    winsound.PlaySound("eat.wav", winsound.SND_ASYNC)
-                except:
-                    pass
-            else:
-                if not bonus_active:
-                    snake.pop()
+        if paused:
+            continue
+        if perf: started = time.perf_counter()
+        ticks = scheduler.due()
+        for _ in range(ticks):
+            direction = pilot.choose(state) if pilot else turns.pop()
+            if recorder and direction:
+                recorder.turn(state.tick, direction)
+            event = state.step(direction)
+            if config["autosave_ticks"] and state.tick % config["autosave_ticks"] == 0:
+                save_game(config, state, snapshotter)
+
+            if event == BONUS:
+                audio.play("bonus")
+            elif event == EAT:
+                audio.play("eat")
+            elif event == DEAD or event == WIN:
+                break
+        if perf: perf.add("logic", started)
+
+        # --- Game Over: Self-Collision or Board Full ---
+        if state.dead or state.won:
+            renderer.draw(state, paused)
+            if recorder: recorder.close(state.tick)
+            savegame.discard(config["save_file"])
+            if pilot is None:  # The autopilot's games stay off the leaderboard
+                best = None
+                if scores:
+                    best = scores.best(state.level)  # Read before the insert below lands
+                    scores.record(state, time.monotonic() - game_started)
+                if not game_over_screen(screen, state.score, won=state.won, best=best):
+                    break # Quit (the autopilot just starts over, for soak tests)
+            state.reset(); paused = False
+            turns.clear()
+            recorder = start_recording(config, state)
+            game_started = time.monotonic()
+            scheduler.reset()
+            renderer.invalidate()
+            renderer.draw(state, paused)
+            continue
 
-        draw(stdscr, snake, food, bonus_food, bonus_active, score, config, paused, bonus_duration, bonus_start_time, direction, new_head)
+        # --- Render once per batch of ticks (frames are skipped under load) ---
+        if remote and remote.repaint:  # Switched to ASCII glyphs
+            remote.repaint = False
+            renderer.invalidate()
+        if ticks and (remote is None or remote.ready()):  # A slow link gets fewer frames, not slower ticks
+            if perf:
+                started = time.perf_counter()
+                if config["perf_hud"]: renderer.hud = perf.hud()
+            renderer.draw(state, paused)
+            turns.presented()
+            if perf:
+                perf.add("draw", started)
+                perf.end_frame(turns.latency_ms())
+
+    if recorder: recorder.close(state.tick)
+    if not (state.dead or state.won):
+        save_game(config, state, snapshotter)
+    audio.close()
+    if scores: scores.close()
+    if perf: perf.close()
+    settings.flush()
+    return close_remote(remote)
+
+def start_spectator_server(args):
+    from spectate import SpectatorServer, parse_address
+    if args.spectate_unix:
+        return SpectatorServer(unix_path=args.spectate_unix).start()
+    host, port = parse_address(args.spectate)
+    return SpectatorServer(host, port).start()
 
 if __name__ == "__main__":
-    curses.wrapper(main)
\ No newline at end of file
+    if sys.argv[1:]:  # argparse only costs startup time when there are options
+        import argparse
+        parser = argparse.ArgumentParser(description="Terminal snake")
+        parser.add_argument("--profile-startup", action="store_true")
+        parser.add_argument("--spectate", metavar="[HOST:]PORT", help="stream the game to spectators over TCP")
+        parser.add_argument("--spectate-unix", metavar="PATH", help="stream the game over a Unix socket")
+        parser.add_argument("--remote", action="store_true", help="adapt drawing to a slow link (see remote.py)")
+        args = parser.parse_args()
+    else:
+        args = None
+    remote = bool(args and args.remote)
+    if args and args.profile_startup:
+        from startup import StartupProfile
+        profile = StartupProfile(STARTED)
+        profile.mark("imports")
+        report = curses.wrapper(main, profile, remote=remote)
+        print(profile.report(), file=sys.stderr)
+    elif args and (args.spectate or args.spectate_unix):
+        server = start_spectator_server(args)
+        report = curses.wrapper(main, None, server, remote)
+        server.stop()
+    else:
+        report = curses.wrapper(main, remote=remote)
+    if report:
+        print(report, file=sys.stderr)  # Remote play's throughput
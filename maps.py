@@ -0,0 +1,219 @@
+# maps.py
+# Level maps. Maps are written as text, one line per board row:
+#
+#   #   wall
+#   @   where the head starts (moving right, the tail to its left);
+#       without one the snake starts in the middle, like on an open board
+#   anything else is open floor. Short lines are padded with floor.
+#
+# The board still wraps at its edges; a map closes them with walls.
+#
+# A map is compiled once into a binary file next to its source (box.txt ->
+# box.snkm) and rebuilt when the source's mtime or size changes. The compiled
+# file holds, after a fixed header:
+#
+#   walls   a bit per cell (bit i of byte i // 8 is cell i)
+#   free    int32 per cell: the open cells, then the walls
+#   slot    int32 per cell: the index of each cell in `free`
+#
+# i.e. the free-cell index of a Board (see board.py) for a board with only
+# the walls on it. Loading maps the file; each new Board gets the arrays
+# through a private copy-on-write mapping, so a game starts without reading
+# or copying the whole map, and food placement and collision checks never
+# look at the map again. The walls are expanded into Board.cells in C.
+import hashlib
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+
+MAGIC = b"SNKM"
+VERSION = 1
+WALL_CHAR = ord("#")
+SPAWN_CHAR = ord("@")
+WALL = 2  # Board.cells value of a wall (the snake is 1)
+# magic, version, byte order, rows, width, spawn cell, open cells, source
+# mtime_ns, source size
+HEADER = struct.Struct("<4sBcIIqQqq")
+ALIGN = 8
+
+# Byte -> WALL or 0 for one bit of a walls byte, for expanding the bitset
+PLANES = [bytes(WALL if byte >> bit & 1 else 0 for byte in range(256)) for bit in range(8)]
+# Map text -> "1" for walls, "0" for everything else
+BITS = bytes(ord("1") if byte == WALL_CHAR else ord("0") for byte in range(256))
+RUNS = re.compile(rb"#+|[^#]+")
+
+
+def aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def cache_path(path):
+    return os.path.splitext(path)[0] + ".snkm"
+
+
+# --- Compiler ---
+def parse(text):
+    # Map text -> (rows, width, cells): one byte per cell, row after row
+    lines = text.replace(b"\r", b"").split(b"\n")
+    if lines and not lines[-1]:
+        lines.pop()
+    rows = len(lines)
+    width = max((len(line) for line in lines), default=0)
+    if not rows or not width:
+        raise ValueError("empty map")
+    return rows, width, b"".join(line.ljust(width) for line in lines)
+
+
+def compile_map(text, source=(0, 0)):
+    rows, width, cells = parse(text)
+    size = rows * width
+    walls = cells.count(WALL_CHAR)
+    spawn = cells.find(SPAWN_CHAR)
+    if spawn != cells.rfind(SPAWN_CHAR):
+        raise ValueError("more than one @ in the map")
+    if spawn < 0:
+        spawn = rows // 2 * width + width // 2
+    y, x = divmod(spawn, width)
+    for cell in (spawn, y * width + (x - 1) % width):
+        if cells[cell] == WALL_CHAR:
+            raise ValueError("no room for the snake at its start")
+
+    # Bit i of the number is cell i: reverse the "0"/"1" text and parse it
+    bits = int(cells.translate(BITS)[::-1], 2).to_bytes((size + 7) // 8, "little")
+
+    # The open cells and the walls come in runs; each run is a range of cell
+    # numbers in `free` and a range of slots, so nothing goes cell by cell
+    free = array("i")
+    wall_cells = array("i")
+    slot = array("i")
+    open_cells = size - walls
+    for run in RUNS.finditer(cells):
+        start, end = run.span()
+        if cells[start] == WALL_CHAR:
+            first = open_cells + len(wall_cells)
+            wall_cells.extend(range(start, end))
+        else:
+            first = len(free)
+            free.extend(range(start, end))
+        slot.extend(range(first, first + end - start))
+    free.extend(wall_cells)
+
+    header = HEADER.pack(MAGIC, VERSION, sys.byteorder[0].encode(), rows, width,
+                         spawn, open_cells, *source)
+    parts = [header.ljust(aligned(HEADER.size), b"\0"), bits.ljust(aligned(len(bits)), b"\0"),
+             free.tobytes(), slot.tobytes()]
+    return b"".join(parts)
+
+
+# --- Compiled maps ---
+class Map:
+    # `data` is the compiled map: an mmap of the cache file, or bytes when
+    # the cache couldn't be written
+    def __init__(self, data, file=None):
+        (magic, version, byteorder, self.rows, self.width, spawn, self.open_cells,
+         *source) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION or byteorder != sys.byteorder[0].encode():
+            raise ValueError("not a compiled map (or from another version)")
+        self.data = data
+        self.file = file
+        self.path = None  # The text map, when it came from load()
+        self.layout = None  # digest(), once asked for
+        self.source = tuple(source)
+        self.size = self.rows * self.width
+        self.spawn = divmod(spawn, self.width)  # Head cell at the start
+        self.bits_at = aligned(HEADER.size)
+        self.free_at = self.bits_at + aligned((self.size + 7) // 8)
+        self.slot_at = self.free_at + 4 * self.size
+        if len(data) != self.slot_at + 4 * self.size:
+            raise ValueError("truncated map")
+
+    @classmethod
+    def open(cls, path):
+        f = open(path, "rb")
+        try:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), f)
+        except (ValueError, OSError):
+            f.close()
+            raise
+
+    # Identifies the layout (size, spawn and walls) whatever the file is
+    # called; replays store it to check they run on the same map
+    def digest(self):
+        if self.layout is None:
+            start = self.bits_at + (self.size + 7) // 8
+            self.layout = hashlib.blake2b(self.data[:HEADER.size - 16] + self.data[self.bits_at:start],
+                                          digest_size=8).digest()
+        return self.layout
+
+    def wall(self, y, x):
+        cell = y * self.width + x
+        return self.data[self.bits_at + (cell >> 3)] >> (cell & 7) & 1
+
+    # (cells, free, slot, free_count) for a new Board; the arrays are the
+    # Board's own to change
+    def board_arrays(self):
+        bits = self.data[self.bits_at:self.bits_at + (self.size + 7) // 8]
+        cells = bytearray(self.size)
+        for bit, plane in enumerate(PLANES):
+            count = len(range(bit, self.size, 8))
+            cells[bit::8] = bits.translate(plane)[:count]
+        if self.file:
+            buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_COPY)
+        else:
+            buffer = bytearray(self.data)
+        view = memoryview(buffer)
+        free = view[self.free_at:self.slot_at].cast("i")
+        slot = view[self.slot_at:self.slot_at + 4 * self.size].cast("i")
+        return cells, free, slot, self.open_cells
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+def load(path):
+    # The compiled map for the text map at `path`, compiling it if the cache
+    # is missing or older than the source. Raises OSError or ValueError.
+    stat = os.stat(path)
+    source = (stat.st_mtime_ns, stat.st_size)
+    cache = cache_path(path)
+    try:
+        compiled = Map.open(cache)
+        if compiled.source == source:
+            compiled.path = path
+            return compiled
+        compiled.close()
+    except (OSError, ValueError):
+        pass
+    with open(path, "rb") as f:
+        data = compile_map(f.read(), source)
+    try:
+        tmp = cache + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, cache)
+        compiled = Map.open(cache)
+    except OSError:
+        compiled = Map(data)  # Read-only directory: keep it in memory
+    compiled.path = path
+    return compiled
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Compile and check level maps")
+    parser.add_argument("maps", nargs="+")
+    args = parser.parse_args()
+    for path in args.maps:
+        started = time.perf_counter()
+        compiled = load(path)
+        loaded = time.perf_counter()
+        compiled.board_arrays()
+        built = time.perf_counter()
+        print(f"{path}: {compiled.rows}x{compiled.width}, {compiled.size - compiled.open_cells} walls, "
+              f"load {(loaded - started) * 1000:.1f} ms, board {(built - loaded) * 1000:.1f} ms")
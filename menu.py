@@ -1,5 +1,6 @@
 import curses
 from constants import SNAKE_ART, DEFAULT_CONFIG
+from palette import get_color
 
 # --- Utility functions (no changes) ---
 def safe_addstr(stdscr, y, x, text, color=None):
@@ -13,15 +14,6 @@ def safe_addstr(stdscr, y, x, text, color=None):
         except curses.error:
             pass
 
-def get_color(config, element):
-    theme = config["theme"]
-    color_data = config["colors"].get(theme, config["colors"]["Default"])
-    if element in color_data:
-        color_index = list(color_data.keys()).index(element) + 1
-        return curses.color_pair(color_index)
-    else:
-        return curses.COLOR_WHITE | curses.COLOR_BLACK
-
 def get_input(stdscr, y, x, prompt, color):
     safe_addstr(stdscr, y, x, prompt, color)
     curses.echo()
@@ -57,6 +49,24 @@ def draw_menu_box(stdscr, top_y, height, width, title, config):
     safe_addstr(stdscr, start_y + box_height, start_x, "└" + "─" * (box_width - 2) + "┘", color)
     return start_y + 1, start_x + 1, box_height - 1, box_width - 2
 
+# --- Menu screens ---
+# The banner, box and labels of a menu are painted once when it opens (and
+# again after a sub-screen covered them); a keypress only repaints the rows
+# whose highlight or value changed. The screen itself is the cache: nothing
+# is cleared between keypresses.
+def draw_banner(stdscr, height, width, config):
+    art_start_y = height // 2 - len(SNAKE_ART) // 2 - 6
+    for i, line in enumerate(SNAKE_ART):
+        safe_addstr(stdscr, art_start_y + i, (width - len(line)) // 2, line, get_color(config, "menu"))
+    return art_start_y + len(SNAKE_ART) + 2  # Top of the box below the art
+
+def draw_menu_screen(stdscr, height, width, title, config):
+    stdscr.erase()
+    box_top_y = draw_banner(stdscr, height, width, config)
+    start_y, start_x, box_height, box_width = draw_menu_box(stdscr, box_top_y, height, width, title, config)
+    safe_addstr(stdscr, start_y + box_height + 1, start_x, "ESC Back", get_color(config, "menu"))
+    return start_y, start_x, box_height, box_width
+
 # --- show_options_menu (Wrap-Around Navigation) ---
 def show_options_menu(stdscr, config, init_colors_main, save_config_main):
     height, width = stdscr.getmaxyx()
@@ -65,24 +75,21 @@ def show_options_menu(stdscr, config, init_colors_main, save_config_main):
         "Speed": "",
         "Sound": "",
         "Theme": "",
+        "Autopilot": "",
         "Help": "",
         "Exit": ""
     }
     menu_keys = list(menu_items.keys())
     current_row = 0
     scroll_offset = 0
+    repaint = True  # Static layer (banner, box) needs painting
+    drawn = {}      # Screen row -> what it shows now
 
     while True:
-        stdscr.clear()
-        # --- Positioning the art, like in main.py ---
-        art_start_y = height // 2 - len(SNAKE_ART) // 2 - 6  # Calculate art position
-        for i, line in enumerate(SNAKE_ART):
-            safe_addstr(stdscr, art_start_y + i, (width - len(line)) // 2, line, get_color(config, "menu"))
-        # ---------------------------------------------
-
-        box_top_y = art_start_y + len(SNAKE_ART) + 2  # Position box below art
-        title = "OPTIONS"
-        start_y, start_x, box_height, box_width = draw_menu_box(stdscr, box_top_y, height, width, title, config)
+        if repaint:
+            start_y, start_x, box_height, box_width = draw_menu_screen(stdscr, height, width, "OPTIONS", config)
+            drawn = {}
+            repaint = False
 
         item_y = start_y + 1
         item_height = 2
@@ -109,23 +116,27 @@ def show_options_menu(stdscr, config, init_colors_main, save_config_main):
                     status_text = str(config['level'])
                 elif key == "Theme":
                     status_text = config['theme']
+                elif key == "Autopilot":
+                    status_text = "On" if config['autopilot'] else "Off"
                 else:
                     status_text = ""
 
+                row = (key, status_text, index == current_row)
+                if drawn.get(y) == row:
+                    continue  # Unchanged since the last keypress
+                drawn[y] = row
                 if index == current_row:
-                    for x in range(start_x, start_x + box_width):
-                        safe_addstr(stdscr, y, x, " ", get_color(config, "highlight"))
+                    safe_addstr(stdscr, y, start_x, " " * box_width, get_color(config, "highlight"))
                     safe_addstr(stdscr, y, shortcut_col_x, shortcut, get_color(config, "highlight"))
                     safe_addstr(stdscr, y, name_col_x, key[:name_col_width], get_color(config, "highlight"))
                     safe_addstr(stdscr, y, status_col_x, status_text[:status_col_width], get_color(config, "highlight"))
                 else:
+                    safe_addstr(stdscr, y, start_x, " " * box_width)  # Clear the old highlight and text
                     safe_addstr(stdscr, y, shortcut_col_x, shortcut, get_color(config, "menu"))
                     safe_addstr(stdscr, y, name_col_x, key[:name_col_width], get_color(config, "menu"))
                     # Change color of status text to white
                     safe_addstr(stdscr, y, status_col_x, status_text[:status_col_width], curses.COLOR_WHITE)
 
-        esc_back = "ESC Back"
-        safe_addstr(stdscr, start_y + box_height + 1, start_x, esc_back, get_color(config, "menu"))
         stdscr.refresh()
         key = stdscr.getch()
 
@@ -161,13 +172,18 @@ def show_options_menu(stdscr, config, init_colors_main, save_config_main):
             return "new_game"
         elif key == ord('h'):
             show_help_screen(stdscr, config)
+            repaint = True
         elif key == ord('t'):
             config["theme"] = change_theme(stdscr, config)
             init_colors_main(config)
             current_row = 3
+            repaint = True
         elif key == ord('d'):
             config["sound_enabled"] = not config["sound_enabled"]
             current_row = 2
+        elif key == ord('u'):
+            config["autopilot"] = not config["autopilot"]
+            current_row = 4
         elif key == 27 or key in (ord("f"), ord("o"), ord("m")):
             break
         elif key == ord('q'):
@@ -187,7 +203,8 @@ def show_options_menu(stdscr, config, init_colors_main, save_config_main):
         elif key in (curses.KEY_ENTER, 10, 13):
             selected_option = menu_keys[current_row]
             if selected_option == "New Game":  return "new_game"
-            if selected_option == "Help":      show_help_screen(stdscr, config)
+            if selected_option == "Autopilot": config["autopilot"] = not config["autopilot"]
+            if selected_option == "Help":      show_help_screen(stdscr, config); repaint = True
             if selected_option == "Exit":      return "quit"
 
     save_config_main(config)
@@ -198,6 +215,7 @@ HELP_TEXT = [
     "Controls:",
     "  - Arrow keys/WASD: Move",
     "  - M/O: Open Menu",
+    "  - U (in the menu): Autopilot",
     "  - Q: Quit",
     "  - F/ESC: Pause/Play",
     "",
@@ -219,36 +237,21 @@ HELP_TEXT = [
 
 def show_help_screen(stdscr, config):
     height, width = stdscr.getmaxyx()
-    stdscr.clear()
-    # --- Positioning the art, like in main.py ---
-    art_start_y = height // 2 - len(SNAKE_ART) // 2 - 6
-    for i, line in enumerate(SNAKE_ART):
-        safe_addstr(stdscr, art_start_y + i, (width - len(line)) // 2, line, get_color(config, "menu"))
-    # ---------------------------------------------
-
-    box_top_y = art_start_y + len(SNAKE_ART) + 2   # Position box below art
-    start_y, start_x, box_height, box_width = draw_menu_box(stdscr, box_top_y, height, width, "HELP", config)
-    esc_back = "ESC Back"
-    safe_addstr(stdscr, start_y + box_height + 1, start_x, esc_back, get_color(config, "menu"))
+    start_y, start_x, box_height, box_width = draw_menu_screen(stdscr, height, width, "HELP", config)
     available_lines = box_height - 1  # Adjust for the border
     scroll_offset = 0
-    #current_row = 0  # Not needed for scrolling behavior
+    drawn_offset = None
 
     while True:
-        stdscr.clear()
-        # --- Positioning the art (AGAIN, inside loop) ---
-        art_start_y = height // 2 - len(SNAKE_ART) // 2 - 6
-        for i, line in enumerate(SNAKE_ART):
-            safe_addstr(stdscr, art_start_y + i, (width - len(line)) // 2, line, get_color(config, "menu"))
-        # ---------------------------------------------
-        box_top_y = art_start_y + len(SNAKE_ART) + 2
-        start_y, start_x, box_height, box_width = draw_menu_box(stdscr, box_top_y, height, width, "HELP", config)
-        safe_addstr(stdscr, start_y + box_height + 1, start_x, esc_back, get_color(config, "menu"))
-
-        for i, line in enumerate(HELP_TEXT):
-            line_y = start_y + 1 + i - scroll_offset
-            if start_y < line_y < start_y + box_height:  # Corrected condition
-                safe_addstr(stdscr, line_y, start_x + 2, line, get_color(config, "text"))
+        if scroll_offset != drawn_offset:
+            # Only the text inside the box moves when scrolling
+            for line_y in range(start_y + 1, start_y + box_height):
+                safe_addstr(stdscr, line_y, start_x, " " * box_width)
+            for i, line in enumerate(HELP_TEXT):
+                line_y = start_y + 1 + i - scroll_offset
+                if start_y < line_y < start_y + box_height:  # Corrected condition
+                    safe_addstr(stdscr, line_y, start_x + 2, line, get_color(config, "text"))
+            drawn_offset = scroll_offset
 
         stdscr.refresh()
         key = stdscr.getch()
@@ -283,18 +286,26 @@ def change_theme(stdscr, config):
     themes = list(config["colors"].keys())
     current_theme_index = themes.index(config["theme"])
 
+    stdscr.erase()
+    drawn_index = None
+
     while True:
-        stdscr.clear()
-        message = "Select Theme: " + themes[current_theme_index]
-        safe_addstr(stdscr, height // 2, (width - len(message)) // 2, message, get_color(config, "menu"))
-
-        for i, theme in enumerate(themes):
-            x = width // 2 - 10 + i * 10
-            y = height // 2 + 2
-            if i == current_theme_index:
-                safe_addstr(stdscr, y, x, theme, get_color(config, "highlight"))
-            else:
-                safe_addstr(stdscr, y, x, theme, get_color(config, "menu"))
+        if current_theme_index != drawn_index:
+            y = height // 2
+            safe_addstr(stdscr, y, 0, " " * (width - 1))  # Messages differ in length
+            message = "Select Theme: " + themes[current_theme_index]
+            safe_addstr(stdscr, y, (width - len(message)) // 2, message, get_color(config, "menu"))
+
+            for i, theme in enumerate(themes):
+                if drawn_index is not None and i not in (drawn_index, current_theme_index):
+                    continue  # Label color unchanged
+                x = width // 2 - 10 + i * 10
+                y = height // 2 + 2
+                if i == current_theme_index:
+                    safe_addstr(stdscr, y, x, theme, get_color(config, "highlight"))
+                else:
+                    safe_addstr(stdscr, y, x, theme, get_color(config, "menu"))
+            drawn_index = current_theme_index
 
         stdscr.refresh()
         key = stdscr.getch()
@@ -0,0 +1,46 @@
+# palette.py
+# Compiled color table shared by the game and the menus. build() runs when a
+# theme is loaded or changed; get_color() is then a single dictionary lookup.
+import curses
+
+# Pair numbers follow this order (pair = index + 1), like the theme dicts
+ELEMENTS = ("snake", "food", "wall", "text", "menu", "highlight",
+            "quit", "option", "score", "bonus_timer", "bonus_food", "border")
+
+DEFAULT_ATTR = curses.COLOR_WHITE | curses.COLOR_BLACK
+
+_attrs = {}  # element -> curses attribute for the active theme
+_pairs = {}  # pair number -> (fg, bg), for targets that aren't curses
+
+
+def theme_colors(config):
+    if config["theme"] == "custom":
+        return config["custom_colors"]
+    return config["colors"].get(config["theme"], config["colors"]["Default"])
+
+
+def build(config):
+    curses.start_color()
+    colors = theme_colors(config)
+    names = list(ELEMENTS) + [name for name in colors if name not in ELEMENTS]
+    _attrs.clear()
+    _pairs.clear()
+    for pair, name in enumerate(names, 1):
+        fg, bg = colors.get(name, (None, None))
+        if isinstance(fg, int) and isinstance(bg, int):
+            curses.init_pair(pair, fg, bg)
+            _pairs[pair] = (fg, bg)
+            _attrs[name] = curses.color_pair(pair)
+
+
+def get_color(config, element):
+    return _attrs.get(element, DEFAULT_ATTR)
+
+
+def pair_colors(pair):
+    return _pairs.get(pair, (curses.COLOR_WHITE, curses.COLOR_BLACK))
+
+
+# Every initialized pair as (pair, (fg, bg)), for targets that replay colors
+def pairs():
+    return sorted(_pairs.items())
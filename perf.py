@@ -0,0 +1,127 @@
+# perf.py
+# Frame-phase instrumentation for the main loop. Each phase of a loop
+# iteration (waiting for input, game logic, food placement, drawing, the
+# terminal refresh) is timed with perf_counter and kept in a rolling window
+# for percentiles; every rendered frame can also be logged to CSV or JSONL,
+# along with the key-to-screen latency of recent turns (TurnQueue).
+# main() only creates a Perf when the HUD or the log is on; otherwise the
+# loop pays one `if perf:` per phase.
+import json
+import time
+from array import array
+
+PHASES = ("wait", "logic", "food", "draw", "refresh")
+WINDOW = 1024       # Frames kept for percentiles
+HUD_INTERVAL = 0.5  # Seconds between HUD updates
+
+
+class Window:
+    # The last WINDOW samples, in a ring
+    def __init__(self):
+        self.samples = array('d')
+        self.next = 0
+
+    def add(self, value):
+        if len(self.samples) < WINDOW:
+            self.samples.append(value)
+        else:
+            self.samples[self.next] = value
+            self.next = (self.next + 1) % WINDOW
+
+    def percentiles(self):
+        # (p50, p95, p99, max) in milliseconds
+        if not self.samples:
+            return (0.0, 0.0, 0.0, 0.0)
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return tuple(ordered[int(last * q)] * 1000 for q in (0.5, 0.95, 0.99, 1.0))
+
+
+class TimedRefresh:
+    # Wraps the render target so refresh() time is counted on its own
+    def __init__(self, target, perf):
+        self.target = target
+        self.perf = perf
+
+    def refresh(self):
+        started = time.perf_counter()
+        self.target.refresh()
+        self.perf.add("refresh", started)
+
+    def __getattr__(self, name):
+        return getattr(self.target, name)
+
+
+class Perf:
+    def __init__(self, log_path=None):
+        self.windows = {phase: Window() for phase in PHASES}
+        self.frame_times = Window()
+        self.frame = dict.fromkeys(PHASES, 0.0)
+        self.frames = 0
+        self.started = time.perf_counter()
+        self.last_frame = None
+        self.hud_at = 0.0
+        self.hud_text = ""
+        self.input_latency = (0.0, 0.0)  # (mean, max) ms, from TurnQueue.latency_ms()
+        self.log = None
+        if log_path:
+            self.log = open(log_path, "w", encoding="utf-8")
+            self.jsonl = log_path.endswith(".jsonl")
+            if not self.jsonl:
+                self.log.write("frame,time_ms,frame_ms," + ",".join(f"{p}_ms" for p in PHASES) +
+                               ",input_mean_ms,input_max_ms\n")
+
+    def wrap(self, target):
+        return TimedRefresh(target, self)
+
+    def add(self, phase, started):
+        self.frame[phase] += time.perf_counter() - started
+
+    # Called once per rendered frame: files the phase times of the loop
+    # iterations since the previous frame
+    def end_frame(self, input_latency=(0.0, 0.0)):
+        now = time.perf_counter()
+        frame = self.frame
+        # Food placement happens inside step() and the refresh inside draw();
+        # menus and new games can add some of either outside those phases
+        frame["logic"] = max(0.0, frame["logic"] - frame["food"])
+        frame["draw"] = max(0.0, frame["draw"] - frame["refresh"])
+        for phase, seconds in frame.items():
+            self.windows[phase].add(seconds)
+        frame_time = now - self.last_frame if self.last_frame is not None else 0.0
+        self.frame_times.add(frame_time)
+        self.last_frame = now
+        self.frames += 1
+        self.input_latency = input_latency
+        if self.log:
+            self.write(now, frame_time, frame)
+        self.frame = dict.fromkeys(PHASES, 0.0)
+
+    def write(self, now, frame_time, frame):
+        if self.jsonl:
+            row = {"frame": self.frames, "time_ms": round((now - self.started) * 1000, 3),
+                   "frame_ms": round(frame_time * 1000, 3)}
+            row.update((f"{phase}_ms", round(frame[phase] * 1000, 3)) for phase in PHASES)
+            row["input_mean_ms"], row["input_max_ms"] = (round(ms, 3) for ms in self.input_latency)
+            self.log.write(json.dumps(row) + "\n")
+        else:
+            values = [(now - self.started), frame_time] + [frame[phase] for phase in PHASES]
+            self.log.write(f"{self.frames}," + ",".join(f"{v * 1000:.3f}" for v in values) +
+                           "".join(f",{ms:.3f}" for ms in self.input_latency) + "\n")
+
+    # Short status-line text, recomputed at most every HUD_INTERVAL
+    def hud(self):
+        now = time.perf_counter()
+        if now - self.hud_at >= HUD_INTERVAL:
+            self.hud_at = now
+            p50, _, p99, _ = self.frame_times.percentiles()
+            fps = 1000 / p50 if p50 else 0
+            draw = self.windows["draw"].percentiles()[2] + self.windows["refresh"].percentiles()[2]
+            self.hud_text = (f"{fps:3.0f}fps {p99:5.1f}ms p99 draw {draw:4.1f}ms "
+                             f"input {self.input_latency[0]:3.0f}ms")
+        return self.hud_text
+
+    def close(self):
+        if self.log:
+            self.log.close()
+            self.log = None
@@ -0,0 +1,432 @@
+# remote.py
+# Remote play: for terminals at the far end of a slow link (SSH across the
+# world). The game draws through a RemoteTarget, an AnsiTarget whose frames
+# are written by a background thread. The game loop never waits for the
+# link: while a frame is still going out, new drawing is held back and sent
+# with the next one, and main() skips rendering until the link is ready.
+#
+# Every frame's size is counted, and how long it took to drain to the
+# terminal is measured by the terminal itself: a frame ends with a cursor
+# position request, and the answer comes back once everything before it has
+# been displayed. (Timing write() and tcdrain() says little over SSH: sshd's
+# PTY and the TCP buffers hide a slow link until they are full.) When frames
+# start to queue the frame interval grows, so the render rate drops below
+# the tick rate while the simulation keeps its own clock; a link that gets
+# too slow is switched to plain ASCII glyphs, a third of the bytes of the
+# box-drawing ones. report() gives the session's throughput.
+#
+#   python main.py --remote
+#   python remote.py --pty-test --bps 2400 --seconds 20   a throttled PTY
+import os
+import re
+import select
+import threading
+import time
+from collections import deque
+
+try:
+    import termios
+except ImportError:
+    termios = None  # No tcdrain(): only write() time is measured
+
+from perf import Window
+from targets import AnsiTarget, CSI
+
+MIN_INTERVAL = 1 / 60    # Never more frames than this
+MAX_INTERVAL = 1.0       # Never fewer
+QUEUE_TARGET = 0.05      # Seconds a frame may wait in buffers on the way
+BACKOFF = 1.5            # Interval growth when frames queue up
+RECOVER = 0.95           # Interval shrink per frame that didn't
+LINK_SHARE = 0.5         # Without probes: share of the time writes may take
+ASCII_INTERVAL = 0.25    # Slower than 4 frames/s: switch to ASCII glyphs
+PROBE = CSI + "6n"       # Device status report: the terminal answers ESC [ row ; col R
+FIRST_PROBES = 2         # Frames on the way before the first answer gives a baseline
+PROBE_TIMEOUT = 5.0      # An unanswered probe after this long was lost (flushinp...)
+REPORT_WAIT_MS = 50      # For the rest of a report after its ESC
+HELD_POLL_MS = 10        # getch() checks this often whether held drawing can go out
+REPORT = re.compile(r"\[\d+;(\d+)R")
+
+# Box drawing and blocks -> ASCII, for slow links
+ASCII = str.maketrans({
+    "║": "|", "│": "|", "═": "-", "─": "-",
+    "╔": "+", "╗": "+", "╚": "+", "╝": "+", "┌": "+", "┐": "+", "└": "+", "┘": "+",
+    "Λ": "^", "█": "#", "░": ".",
+})
+
+
+class RemoteTarget(AnsiTarget):
+    # Every frame ends with a cursor position request. The terminal answers
+    # once it has got that far, so the time to the answer is how long the
+    # frame took to drain through every buffer on the way (the PTY, sshd,
+    # TCP). getch() takes the answers out of the input. When frames start
+    # to queue the frame interval grows; terminals that never answer fall
+    # back to timing write() and tcdrain().
+    def __init__(self, fd=None, keys=None, size=None, ascii=False):
+        super().__init__(fd, keys, size)
+        self.ascii = ascii
+        self.repaint = False  # Set when the glyphs changed; main() repaints
+        self.interval = MIN_INTERVAL
+        self.next_frame = 0.0
+        self.delay = -1       # getch() timeout set by the caller
+        self.pushback = deque()
+        self.probing = True
+        self.probes = deque()  # (column, send time) of unanswered probes, oldest first
+        self.probe_count = 0
+        self.base = None       # Fastest answer so far: the link's round trip
+        self.answered = 0
+        self.lost = 0
+        # Writer thread
+        self.busy = False
+        self.pending = None
+        self.wake = threading.Event()
+        self.stopping = False
+        # Stats
+        self.drains = Window()
+        self.writes = Window()
+        self.largest = 0
+        self.sent = 0
+        self.held = 0      # refresh() calls that found the link busy
+        self.skipped = 0   # Frames main() didn't render
+        self.ascii_at = None
+        self.started = time.monotonic()
+        self.thread = threading.Thread(target=self.run, name="remote-writer", daemon=True)
+        self.thread.start()
+
+    def addstr(self, y, x, text, attr=0):
+        if self.ascii:
+            text = text.translate(ASCII)
+        super().addstr(y, x, text, attr)
+
+    # Called by main() before rendering a frame
+    def ready(self):
+        now = time.monotonic()
+        while self.probes and now - self.probes[0][1] > PROBE_TIMEOUT:
+            self.probes.popleft()
+            self.lost += 1
+            if not self.answered and self.lost >= 3:
+                self.probing = False  # This terminal doesn't answer
+                self.probes.clear()
+        if self.base is None:
+            behind = len(self.probes) >= FIRST_PROBES
+        else:
+            behind = self.probes and now - self.probes[0][1] > self.base + QUEUE_TARGET
+        if self.busy or now < self.next_frame or behind:
+            self.skipped += 1
+            return False
+        return True
+
+    def refresh(self):
+        if not self.out or self.busy:
+            if self.out:
+                self.held += 1
+            return  # Goes out with the next frame
+        now = time.monotonic()
+        if self.probing:
+            # The cursor goes to a column of its own first, so the answer
+            # says which probe it is for. Not on the top row: xterm's
+            # terminfo reads ESC [ 1 ; n R as a shifted F3.
+            height, width = self.size
+            column = self.probe_count % width + 1
+            self.probe_count += 1
+            self.out.append(f"{CSI}{height};{column}H{PROBE}")
+            self.probes.append((column, now))
+            self.cursor = None
+        self.pending = "".join(self.out).encode("utf-8")
+        self.out = []
+        self.next_frame = now + self.interval
+        self.busy = True
+        self.wake.set()
+
+    noutrefresh = refresh
+
+    # --- Input: cursor reports are taken out ---
+    def timeout(self, delay):
+        self.delay = delay
+        self.keys.timeout(delay)
+
+    def getch(self):
+        while True:
+            key = self.pushback.popleft() if self.pushback else self.wait_key()
+            if key != 27 or not self.probes or not self.read_report():
+                return key
+            if self.delay >= 0:
+                return -1  # Counts as the timeout; a blocking read waits on
+
+    def wait_key(self):
+        # Waits as long as the caller asked. While drawing is held back for a
+        # busy link it waits in short steps and sends the drawing as soon as
+        # the link is free, so a screen drawn just before a blocking read (a
+        # pause, a menu, game over) still gets out.
+        deadline = None if self.delay < 0 else time.monotonic() + self.delay / 1000
+        polled = False
+        while self.out:
+            if not self.busy:
+                self.refresh()
+                break
+            wait = HELD_POLL_MS
+            if deadline is not None:
+                wait = min(wait, max(0, int((deadline - time.monotonic()) * 1000)))
+            self.keys.timeout(wait)
+            try:
+                key = super().getch()
+            finally:
+                self.keys.timeout(self.delay)
+            if key != -1 or (deadline is not None and time.monotonic() >= deadline):
+                return key
+            polled = True
+        if polled and deadline is not None:  # What's left of the caller's timeout
+            self.keys.timeout(max(0, int((deadline - time.monotonic()) * 1000)))
+            try:
+                return super().getch()
+            finally:
+                self.keys.timeout(self.delay)
+        return super().getch()
+
+    def read_report(self):
+        chars = []
+        self.keys.timeout(REPORT_WAIT_MS)
+        try:
+            while len(chars) < 16:
+                key = self.keys.getch()
+                if key == -1:
+                    break
+                chars.append(key)
+                if key == ord("R"):
+                    break
+        finally:
+            self.keys.timeout(self.delay)
+        report = REPORT.fullmatch("".join(chr(c) for c in chars if 0 <= c < 0x110000))
+        if report:
+            self.answer(int(report.group(1)), time.monotonic())
+            return True
+        self.pushback.extend(chars)  # An ESC keypress and whatever followed it
+        return False
+
+    def answer(self, column, now):
+        if all(probe[0] != column for probe in self.probes):
+            return  # Given up on already
+        while self.probes[0][0] != column:
+            self.probes.popleft()  # Its answer went missing
+            self.lost += 1
+        drain = now - self.probes.popleft()[1]
+        self.answered += 1
+        self.drains.add(drain)
+        self.base = drain if self.base is None else min(self.base, drain)
+        if drain - self.base > QUEUE_TARGET:
+            self.adapt(self.interval * BACKOFF)
+        else:
+            self.adapt(self.interval * RECOVER)
+
+    def adapt(self, interval):
+        self.interval = min(MAX_INTERVAL, max(MIN_INTERVAL, interval))
+        if not self.ascii and self.interval >= ASCII_INTERVAL:
+            # One way: a link that was this slow once stays on ASCII
+            self.ascii = True
+            self.ascii_at = time.monotonic() - self.started
+            self.repaint = True
+
+    # --- Writer thread ---
+    def run(self):
+        while True:
+            self.wake.wait()
+            self.wake.clear()
+            if self.pending is None:
+                if self.stopping:
+                    return
+                continue
+            data, self.pending = self.pending, None
+            started = time.monotonic()
+            try:
+                self.write(data)
+            except OSError:
+                self.stopping = True  # The terminal went away
+            self.frame_sent(len(data), time.monotonic() - started)
+            self.busy = False
+            if self.stopping:
+                return
+
+    def write(self, data):
+        view = memoryview(data)
+        while view:
+            written = os.write(self.fd, view)
+            view = view[written:]
+        if termios and os.isatty(self.fd):
+            termios.tcdrain(self.fd)
+
+    def frame_sent(self, size, seconds):
+        self.sent += 1
+        self.bytes_written += size
+        self.frames += 1
+        self.largest = max(self.largest, size)
+        self.writes.add(seconds)
+        if not self.probing:
+            self.adapt(max(seconds / LINK_SHARE, self.interval * RECOVER))
+
+    def close(self, timeout=2.0):
+        # Let the last frame out, then what's left of the drawing
+        deadline = time.monotonic() + timeout
+        while self.busy and time.monotonic() < deadline:
+            time.sleep(0.005)
+        if not self.busy and self.out:
+            self.probing = False  # Nobody reads the answer any more
+            self.refresh()
+            while self.busy and time.monotonic() < deadline:
+                time.sleep(0.005)
+        self.stopping = True
+        self.wake.set()
+        self.thread.join(max(0.0, deadline - time.monotonic()))
+
+    # --- Session stats ---
+    def stats(self):
+        seconds = time.monotonic() - self.started
+        drain = self.drains.percentiles()
+        write = self.writes.percentiles()
+        return {"seconds": round(seconds, 1), "frames": self.sent, "bytes": self.bytes_written,
+                "frames_per_second": round(self.sent / seconds, 1) if seconds else 0.0,
+                "bytes_per_second": round(self.bytes_written / seconds) if seconds else 0,
+                "bytes_per_frame": round(self.bytes_written / self.sent) if self.sent else 0,
+                "largest_frame": self.largest,
+                "drain_p50_ms": round(drain[0], 1), "drain_p95_ms": round(drain[1], 1),
+                "write_p95_ms": round(write[1], 1),
+                "probes_answered": self.answered, "probes_lost": self.lost,
+                "frames_skipped": self.skipped, "frames_merged": self.held,
+                "interval_ms": round(self.interval * 1000, 1), "ascii_after": self.ascii_at}
+
+    def report(self):
+        s = self.stats()
+        ascii = f", ASCII after {s['ascii_after']:.1f}s" if s["ascii_after"] is not None else ""
+        drain = (f"drain p50 {s['drain_p50_ms']} ms p95 {s['drain_p95_ms']} ms"
+                 if s["probes_answered"] else "no cursor reports")
+        return (f"remote: {s['frames']} frames in {s['seconds']}s ({s['frames_per_second']}/s), "
+                f"{s['bytes_per_frame']} B/frame, {s['bytes_per_second'] / 1000:.1f} kB/s, "
+                f"{drain}, write p95 {s['write_p95_ms']} ms, "
+                f"{s['frames_skipped']} frames skipped{ascii}")
+
+
+# --- PTY test ---
+PROBE_AT = re.compile(rb"\x1b\[(\d+;\d+)H\x1b\[6n")
+
+
+class FdKeys:
+    # The getch()/timeout() of a curses window, over a raw file descriptor
+    def __init__(self, fd, size):
+        self.fd = fd
+        self.size = size
+        self.delay = -1
+        self.buffer = b""
+
+    def timeout(self, delay):
+        self.delay = delay
+
+    def nodelay(self, flag):
+        self.delay = 0 if flag else -1
+
+    def getmaxyx(self):
+        return self.size
+
+    def getch(self):
+        if not self.buffer:
+            wait = None if self.delay < 0 else self.delay / 1000
+            if not select.select([self.fd], [], [], wait)[0]:
+                return -1
+            self.buffer = os.read(self.fd, 256)
+        key, self.buffer = self.buffer[0], self.buffer[1:]
+        return key
+
+
+def throttled_terminal(fd, bps, stop, counts):
+    # The far end of a slow link: reads the PTY at most `bps` bytes per
+    # second and answers cursor position requests once it gets to them
+    chunk = max(1, bps // 50)
+    tail = b""
+    while not stop.is_set():
+        try:
+            data = os.read(fd, chunk)
+        except OSError:
+            return
+        counts[0] += len(data)
+        time.sleep(len(data) / bps)
+        seen = tail + data
+        end = 0
+        for probe in PROBE_AT.finditer(seen):
+            os.write(fd, CSI.encode() + probe.group(1) + b"R")
+            end = probe.end()
+        tail = seen[end:][-16:]  # A probe split across reads
+
+
+def pty_test(bps, seconds, level, size):
+    import pty
+    import tty
+    from autopilot import Autopilot
+    from constants import DEFAULT_CONFIG
+    from engine import GameState, tick_seconds
+    from render import Renderer
+    from scheduler import FixedStep
+
+    master, slave = pty.openpty()
+    tty.setraw(slave)  # No newline translation: bytes in are bytes out
+    tty.setraw(master)
+    stop = threading.Event()
+    counts = [0]
+    terminal = threading.Thread(target=throttled_terminal, args=(master, bps, stop, counts), daemon=True)
+    terminal.start()
+
+    target = RemoteTarget(slave, FdKeys(slave, size), size)
+    state = GameState(*size, level, seed=1)
+    renderer = Renderer(target, dict(DEFAULT_CONFIG))
+    pilot = Autopilot()
+    scheduler = FixedStep(tick_seconds(level))
+    started = time.monotonic()
+    ticks = 0
+    lag = Window()  # How late ticks ran
+    while time.monotonic() - started < seconds:
+        # Like main(): wait for input until the next tick is due
+        target.timeout(max(0, round(scheduler.wait_ms())))
+        target.getch()
+        due = scheduler.due()
+        if not due:
+            continue
+        lag.add(max(0.0, time.monotonic() - started - (ticks + due) * tick_seconds(level)))
+        for _ in range(due):
+            state.step(pilot.choose(state))
+            ticks += 1
+            if state.dead or state.won:
+                state.reset()
+        if target.repaint:
+            target.repaint = False
+            renderer.invalidate()
+        if target.ready():
+            renderer.draw(state, False)
+    elapsed = time.monotonic() - started
+    # The pause screen, drawn while a frame may still be going out, must
+    # get out during the long wait for a key that follows it
+    renderer.draw(state, True)
+    target.timeout(3000)
+    target.getch()
+    held = bool(target.out)
+    target.close()
+    stop.set()
+    os.close(slave)
+    os.close(master)
+    print(target.report())
+    print(f"simulation: {ticks} ticks in {elapsed:.1f}s, {elapsed / tick_seconds(level):.0f} due, "
+          f"lag p95 {lag.percentiles()[1]:.1f} ms; "
+          f"terminal read {counts[0]} bytes ({counts[0] / elapsed / 1000:.2f} kB/s of {bps / 1000:.2f})")
+    if held:
+        raise SystemExit("pty test failed: the pause screen was still held back after a 3 s wait for a key")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Remote play tools")
+    parser.add_argument("--pty-test", action="store_true", help="play headless into a throttled PTY and report")
+    parser.add_argument("--bps", type=int, default=2400, help="bytes per second the PTY is read at")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--level", type=int, default=8)
+    parser.add_argument("--size", default="24x80", help="terminal size, HxW")
+    args = parser.parse_args()
+    if args.pty_test:
+        size = tuple(int(n) for n in args.size.split("x"))
+        pty_test(args.bps, args.seconds, args.level, size)
+    else:
+        parser.print_help()
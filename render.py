@@ -0,0 +1,363 @@
+# render.py
+# In-game drawing. The Renderer paints the whole screen once and afterwards
+# only touches the cells that changed since the previous frame. The board
+# can be bigger than the terminal; a Viewport then picks the part around
+# the head, and only cells inside it are ever drawn.
+import curses
+import re
+from constants import SNAKE_SEGMENTS, FOOD_CHAR, BONUS_FOOD_CHAR, HORIZONTAL_BORDER_CHAR
+from engine import UP, DOWN, LEFT, RIGHT
+from menu import safe_addstr
+from palette import get_color
+
+WALL_RUNS = re.compile(b"\x02+")  # Runs of wall cells in Board.cells (maps.WALL)
+
+def display_game_ui(stdscr, score, config, width, paused, hud=""):
+    height = stdscr.getmaxyx()[0]
+    score_str = f"{score:04}"
+    safe_addstr(stdscr, height - 1, 1, score_str, get_color(config, "score"))
+    if hud:
+        safe_addstr(stdscr, height - 1, 8, hud[:max(0, width - 18)], get_color(config, "score"))
+    menu_str = "M Menu"
+    menu_x = width - len(menu_str) - 2
+    safe_addstr(stdscr, height - 1, menu_x, menu_str, get_color(config, "option"))
+
+def draw_bonus_timer(stdscr, remaining_time, total_time, config, width):
+    timer_width = width - 4
+    filled_width = int(timer_width * (remaining_time / total_time))
+    empty_width = timer_width - filled_width
+    timer_y = stdscr.getmaxyx()[0] - 2  # Adjusted position
+    timer_str = "█" * filled_width + "░" * empty_width  # Use ░█ and ░
+    safe_addstr(stdscr, timer_y, 2, timer_str, get_color(config, "bonus_timer"))
+
+# Only the cells between the old and the new end of the bar, usually one
+def draw_bonus_timer_change(stdscr, old_fill, fill, config):
+    low, high = min(old_fill, fill), max(old_fill, fill)
+    timer_y = stdscr.getmaxyx()[0] - 2
+    safe_addstr(stdscr, timer_y, 2 + low, "█" * (fill - low) + "░" * (high - fill), get_color(config, "bonus_timer"))
+
+def draw_border(stdscr, config, width):
+    border_y = stdscr.getmaxyx()[0] - 2
+    safe_addstr(stdscr, border_y, 0, HORIZONTAL_BORDER_CHAR * width, get_color(config, "border"))
+
+def get_snake_segment(prev_segment, current_segment, next_segment):
+    px, py = prev_segment
+    cx, cy = current_segment
+    nx, ny = next_segment
+
+    if px == cx == nx: return SNAKE_SEGMENTS["vertical"]    # Vertical
+    if py == cy == ny: return SNAKE_SEGMENTS["horizontal"]  # Horizontal
+
+    # Corners (curvy)
+    if (cx > px and cy < ny) or (cx < nx and cy > py): return SNAKE_SEGMENTS["bottom_left"]
+    if (cx > px and cy > ny) or (cx < nx and cy < py): return SNAKE_SEGMENTS["top_left"]
+    if (cx < px and cy < ny) or (cx > nx and cy > py):  return SNAKE_SEGMENTS["bottom_right"]
+    if (cx < px and cy > ny) or (cx > nx and cy < py): return SNAKE_SEGMENTS["top_right"]
+
+    return "O"  # Fallback
+
+def get_snake_head(direction):
+      # More distinct head shapes
+    if direction == UP:    return "Λ"
+    elif direction == DOWN:  return "V"
+    elif direction == LEFT:  return "<"
+    elif direction == RIGHT: return ">"
+    return "O"
+
+def get_snake_tail(tail, second_last):
+    tx, ty = tail
+    sx, sy = second_last
+    # Pointed tail
+    if ty < sy:   return SNAKE_SEGMENTS["tail_left"]
+    elif ty > sy: return SNAKE_SEGMENTS["tail_right"]
+    elif tx < sx: return SNAKE_SEGMENTS["tail_up"]
+    elif tx > sx: return SNAKE_SEGMENTS["tail_down"]
+    return "o"
+
+def timer_fill(state, width):
+    if not state.bonus_active:
+        return None
+    return int((width - 4) * (state.bonus_remaining / state.bonus_duration))
+
+
+class SnakeGlyphs:
+    # Glyph of every snake cell, kept in step with the body: new heads are
+    # pushed, popped tails dropped, and only the neck and tail recomputed.
+    def __init__(self):
+        self.cells = {}
+        self.generation = None
+        self.pushes = 0
+
+    def rebuild(self, state):
+        self.cells = {}
+        snake = state.snake
+        last = len(snake) - 1
+        for i, segment in enumerate(snake):
+            if i == 0:
+                segment_char = get_snake_head(state.direction)
+            elif i == last:
+                segment_char = get_snake_tail(segment, prev_segment)
+            else:
+                segment_char = get_snake_segment(prev_segment, segment, snake[i + 1])
+            self.cells[segment] = segment_char
+            prev_segment = segment
+        self.generation = state.generation
+
+    # Catch up with the moves made since the last sync. `vacated` holds the
+    # cells the tail left. Returns the cells whose glyph changed.
+    def sync(self, state, vacated):
+        snake = state.snake
+        moved = state.pushes - self.pushes
+        if state.generation != self.generation or moved >= len(snake) - 1:
+            self.rebuild(state)
+            return list(snake)
+        if not moved:
+            return []
+        cells = self.cells
+        for cell in vacated:
+            cells.pop(cell, None)
+        changed = [snake[0]]
+        cells[snake[0]] = get_snake_head(state.direction)
+        for i in range(1, moved + 1):
+            segment = snake[i]
+            cells[segment] = get_snake_segment(snake[i - 1], segment, snake[i + 1])
+            changed.append(segment)
+        tail = snake[-1]
+        cells[tail] = get_snake_tail(tail, snake[-2])
+        changed.append(tail)
+        self.pushes = state.pushes
+        return changed
+
+
+class Viewport:
+    # The part of the board on screen. The board wraps around, so the view
+    # does too. When the board fits on the screen the view stays at (0, 0)
+    # and board and screen coordinates are the same.
+    def __init__(self):
+        self.top = 0
+        self.left = 0
+        self.rows = 0          # Playfield rows and columns on screen
+        self.columns = 0
+        self.board_rows = 0
+        self.board_width = 0
+        self.whole = True      # The whole board is on screen, at (0, 0)
+
+    # Returns True when the visible area changed size
+    def fit(self, state, height, width):
+        size = (min(height - 2, state.rows), min(width, state.width), state.rows, state.width)
+        if size == (self.rows, self.columns, self.board_rows, self.board_width):
+            return False
+        self.rows, self.columns, self.board_rows, self.board_width = size
+        self.top = self.top if self.rows < self.board_rows else 0
+        self.left = self.left if self.columns < self.board_width else 0
+        self.whole = self.rows == self.board_rows and self.columns == self.board_width
+        return True
+
+    # Keep `cell` away from the edges: once it gets within a quarter of the
+    # view of one, recenter on it. Returns True when the view moved.
+    def follow(self, cell):
+        top = scroll(self.top, cell[0], self.rows, self.board_rows)
+        left = scroll(self.left, cell[1], self.columns, self.board_width)
+        if (top, left) == (self.top, self.left):
+            return False
+        self.top, self.left = top, left
+        return True
+
+    # Screen position of a board cell, or None when it's off screen
+    def to_screen(self, y, x):
+        if y >= self.board_rows or x >= self.board_width:
+            return None  # Left behind by a resize
+        sy = (y - self.top) % self.board_rows
+        sx = (x - self.left) % self.board_width
+        if sy < self.rows and sx < self.columns:
+            return sy, sx
+        return None
+
+    # Visible board columns as (first, end, screen x of first), two spans
+    # when the view wraps around the right edge
+    def spans(self):
+        end = self.left + self.columns
+        if end <= self.board_width:
+            return ((self.left, end, 0),)
+        return ((self.left, self.board_width, 0), (0, end - self.board_width, self.board_width - self.left))
+
+
+def scroll(origin, position, size, board):
+    if size >= board:
+        return 0
+    margin = size // 4
+    if margin <= (position - origin) % board < size - margin:
+        return origin
+    return (position - size // 2) % board
+
+
+class Renderer:
+    def __init__(self, stdscr, config):
+        self.stdscr = stdscr
+        self.config = config
+        self.glyphs = SnakeGlyphs()
+        self.view = Viewport()
+        self.full = True
+        self.hud = ""  # Performance overlay for the status line, set by main()
+
+    # Force a full repaint on the next frame (resize, menus, new game...)
+    def invalidate(self):
+        self.full = True
+
+    def draw(self, state, paused):
+        if state.damage is None:
+            state.damage = set()
+        changed = self.glyphs.sync(state, state.damage)
+        height, width = self.stdscr.getmaxyx()
+        if self.view.fit(state, height, width):
+            self.full = True
+        if not self.view.whole and self.view.follow(state.snake[0]):
+            self.full = True  # Scrolled: everything on screen moved
+        if self.full or paused != self.paused or state.generation != self.generation:
+            self.repaint(state, paused)
+        else:
+            self.update(state, changed)
+        state.damage.clear()
+        self.stdscr.refresh()
+
+    def repaint(self, state, paused):
+        stdscr = self.stdscr
+        config = self.config
+        stdscr.erase()
+        height, width = stdscr.getmaxyx()
+
+        if state.board.walls:
+            self.draw_walls(state)
+        self.draw_snake(state)
+        self.draw_food(state)
+
+        # --- Single-line border ABOVE the score/status line ---
+        draw_border(stdscr, config, width)
+
+        safe_addstr(stdscr, height - 1, 0, " " * width, get_color(config, 'score'))
+        display_game_ui(stdscr, state.score, config, width, paused, self.hud)
+
+        # --- Bonus Timer BELOW border ---
+        if state.bonus_active:
+            draw_bonus_timer(stdscr, state.bonus_remaining, state.bonus_duration, config, width)
+
+        if paused:
+            pause_message = "PAUSED"
+            safe_addstr(stdscr, height // 2, (width - len(pause_message)) // 2, pause_message, get_color(config, "menu") | curses.A_BOLD)
+
+        self.full = False
+        self.paused = paused
+        self.generation = state.generation
+        self.food = state.food
+        self.bonus_food = state.bonus_food
+        self.score = state.score
+        self.drawn_hud = self.hud
+        self.timer_fill = timer_fill(state, width)
+
+    def update(self, state, changed):
+        stdscr = self.stdscr
+        config = self.config
+        width = stdscr.getmaxyx()[1]
+        board = state.board
+
+        # Board cells are screen cells unless the view scrolls
+        to_screen = None if self.view.whole else self.view.to_screen
+
+        # --- Cells the snake or the food left ---
+        damaged = bool(state.damage)
+        empty = self.config["empty_char"]
+        for y, x in state.damage:
+            if y < board.rows and x < board.width and not board.occupied(y, x):
+                position = to_screen(y, x) if to_screen else (y, x)
+                if position:
+                    safe_addstr(stdscr, position[0], position[1], empty)
+
+        # --- Head, the segments behind it that turned into body, and the tail ---
+        if changed:
+            color = get_color(config, "snake")
+            glyphs = self.glyphs.cells
+            for cell in changed:
+                position = to_screen(*cell) if to_screen else cell
+                if position:
+                    safe_addstr(stdscr, position[0], position[1], glyphs[cell], color)
+
+        if damaged or state.food != self.food or state.bonus_food != self.bonus_food:
+            self.draw_food(state)
+            self.food = state.food
+            self.bonus_food = state.bonus_food
+
+        if state.score != self.score or self.hud != self.drawn_hud:
+            # Blank out what's left of a longer overlay
+            hud = self.hud.ljust(len(self.drawn_hud))
+            display_game_ui(stdscr, state.score, config, width, False, hud)
+            self.score = state.score
+            self.drawn_hud = self.hud
+
+        fill = timer_fill(state, width)
+        if fill != self.timer_fill:
+            if fill is None:
+                draw_border(stdscr, config, width)
+            elif self.timer_fill is None:
+                draw_bonus_timer(stdscr, state.bonus_remaining, state.bonus_duration, config, width)
+            else:
+                draw_bonus_timer_change(stdscr, self.timer_fill, fill, config)
+            self.timer_fill = fill
+
+    # A snake longer than the view is drawn by scanning the visible rows of
+    # the board bitmap, which skips straight to occupied cells; either way
+    # the cost is bounded by the screen area, not the board or the snake.
+    def draw_snake(self, state):
+        stdscr = self.stdscr
+        view = self.view
+        color = get_color(self.config, "snake")
+        glyphs = self.glyphs.cells
+        if view.whole or len(glyphs) < view.rows * view.columns // 4:
+            to_screen = None if view.whole else view.to_screen
+            for cell, segment_char in glyphs.items():
+                position = to_screen(*cell) if to_screen else cell
+                if position:
+                    safe_addstr(stdscr, position[0], position[1], segment_char, color)
+            return
+        occupied = state.board.cells
+        width = view.board_width
+        spans = view.spans()
+        for sy in range(view.rows):
+            y = (view.top + sy) % view.board_rows
+            row = y * width
+            for first, end, sx in spans:
+                offset = sx - first
+                i = occupied.find(1, row + first, row + end)
+                while i != -1:
+                    x = i - row
+                    segment_char = glyphs.get((y, x))
+                    if segment_char:
+                        safe_addstr(stdscr, sy, x + offset, segment_char, color)
+                    i = occupied.find(1, i + 1, row + end)
+
+    # Walls never change, so they are only drawn on a repaint: a string per
+    # run of wall cells in each visible row
+    def draw_walls(self, state):
+        stdscr = self.stdscr
+        view = self.view
+        color = get_color(self.config, "wall")
+        wall_char = self.config["wall_char"]
+        cells = state.board.cells
+        width = view.board_width
+        spans = view.spans()
+        for sy in range(view.rows):
+            row = (view.top + sy) % view.board_rows * width
+            for first, end, sx in spans:
+                offset = sx - first
+                for run in WALL_RUNS.finditer(cells, row + first, row + end):
+                    start, stop = run.span()
+                    safe_addstr(stdscr, sy, start - row + offset, wall_char * (stop - start), color)
+
+    def draw_food(self, state):
+        if state.bonus_active and state.bonus_food:
+            position = self.view.to_screen(*state.bonus_food)
+            if position:
+                safe_addstr(self.stdscr, position[0], position[1], BONUS_FOOD_CHAR, get_color(self.config, "bonus_food"))
+        if state.food:
+            position = self.view.to_screen(*state.food)
+            if position:
+                safe_addstr(self.stdscr, position[0], position[1], FOOD_CHAR, get_color(self.config, "food"))
@@ -0,0 +1,230 @@
+# replay.py
+# Compact game recordings. A replay is the seed, board size, level and map
+# plus the (tick, input) stream; re-running it through GameState reproduces
+# the game exactly. The map is stored as its path and the digest of its
+# layout (maps.Map.digest); a replay only runs on a map with that digest.
+# Usage: python replay.py FILE [--speed N | --headless] [--map PATH]
+import argparse
+import curses
+import os
+import struct
+import time
+
+from engine import GameState, UP, DOWN, LEFT, RIGHT, tick_seconds
+
+MAGIC = b"SNKR"
+VERSION = 2
+HEADER = struct.Struct("<4sBIHHB")  # magic, version, seed, height, width, level
+MAP = struct.Struct("<8sH")  # Since version 2: map digest (zeros: open board), path length; the path follows
+OPEN_BOARD = bytes(MAP.size - 2)
+
+# --- Record codes ---
+END = 0
+LEVEL = 5
+RESIZE = 6
+DIRECTION_CODES = {UP: 1, DOWN: 2, LEFT: 3, RIGHT: 4}
+CODE_DIRECTIONS = {code: direction for direction, code in DIRECTION_CODES.items()}
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class Recorder:
+    # Records one game. Inputs are buffered and written as the game goes on;
+    # the tick of each record is stored as a delta from the previous one.
+    def __init__(self, path, state, buffer_size=65536):
+        self.path = path
+        self.file = open(path, "wb", buffering=buffer_size)
+        self.file.write(HEADER.pack(MAGIC, VERSION, state.seed, state.height, state.width, state.level))
+        walls = state.walls
+        path = (walls.path or "").encode("utf-8") if walls else b""
+        self.file.write(MAP.pack(walls.digest() if walls else OPEN_BOARD, len(path)) + path)
+        self.last_tick = state.tick
+
+    def record(self, tick, code, *args):
+        out = bytearray()
+        write_varint(out, tick - self.last_tick)
+        out.append(code)
+        for arg in args:
+            write_varint(out, arg)
+        self.file.write(out)
+        self.last_tick = tick
+
+    # Call just before state.step(direction)
+    def turn(self, tick, direction):
+        self.record(tick, DIRECTION_CODES[direction])
+
+    def level(self, tick, level):
+        self.record(tick, LEVEL, level)
+
+    def resize(self, tick, height, width):
+        self.record(tick, RESIZE, height, width)
+
+    def close(self, tick):
+        if self.file is not None:
+            self.record(tick, END)
+            self.file.close()
+            self.file = None
+
+
+def new_recording(replay_dir, state):
+    os.makedirs(replay_dir, exist_ok=True)
+    name = time.strftime("%Y%m%d-%H%M%S") + f"-{state.seed:08x}.snkr"
+    return Recorder(os.path.join(replay_dir, name), state)
+
+
+class Replay:
+    def __init__(self, data):
+        magic, version, self.seed, self.height, self.width, self.level = HEADER.unpack_from(data)
+        if magic != MAGIC or version not in (1, VERSION):
+            raise ValueError("not a snake replay (or an unsupported version)")
+        self.data = data
+        self.start = HEADER.size
+        self.map_digest = None  # Version 1 didn't record the map
+        self.map_path = None
+        if version >= 2:
+            self.map_digest, length = MAP.unpack_from(data, self.start)
+            self.start += MAP.size
+            self.map_path = data[self.start:self.start + length].decode("utf-8") or None
+            self.start += length
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    # Yields (tick, code, args) records
+    def records(self):
+        data = self.data
+        pos = self.start
+        tick = 0
+        while pos < len(data):
+            delta, pos = read_varint(data, pos)
+            tick += delta
+            code = data[pos]
+            pos += 1
+            args = ()
+            if code == LEVEL:
+                level, pos = read_varint(data, pos)
+                args = (level,)
+            elif code == RESIZE:
+                height, pos = read_varint(data, pos)
+                width, pos = read_varint(data, pos)
+                args = (height, width)
+            yield tick, code, args
+            if code == END:
+                return
+
+    # `walls` must be the map the game was played on (None: an open board).
+    # Raises ValueError for another one, rather than replaying a game that
+    # would go differently.
+    def new_state(self, walls=None):
+        if self.map_digest is not None:
+            digest = walls.digest() if walls else OPEN_BOARD
+            if digest != self.map_digest:
+                if self.map_digest == OPEN_BOARD:
+                    raise ValueError("the replay was played on an open board, not a map")
+                if walls is None:
+                    raise ValueError(f"the replay was played on map {self.map_path or '(unnamed)'}; pass --map")
+                raise ValueError(f"the replay was played on a different map than {walls.path or 'this one'} "
+                                 f"(recorded: {self.map_path or '(unnamed)'})")
+        return GameState(self.height, self.width, self.level, self.seed, walls)
+
+    # Re-run the game, yielding the state after every tick
+    def ticks(self, state=None):
+        state = state or self.new_state()
+        for tick, code, args in self.records():
+            while state.tick < tick and not (state.dead or state.won):
+                state.step()
+                yield state
+            if code == END or state.dead or state.won:
+                return
+            if code == LEVEL:
+                state.level = args[0]
+            elif code == RESIZE:
+                state.resize(*args)
+            else:
+                state.step(CODE_DIRECTIONS[code])
+                yield state
+
+
+# Headless playback at full speed; returns the final state
+def run(replay, walls=None):
+    state = replay.new_state(walls)
+    for state in replay.ticks(state):
+        pass
+    return state
+
+
+def play_on_screen(stdscr, replay, speed, walls=None):
+    from render import Renderer
+    from palette import build as init_colors
+    from main import load_config
+    from scheduler import FixedStep
+    from targets import CursesTarget
+
+    curses.curs_set(0)
+    stdscr = CursesTarget(stdscr)
+    config = load_config()
+    init_colors(config)
+    state = replay.new_state(walls)
+    renderer = Renderer(stdscr, config)
+    scheduler = FixedStep(tick_seconds(state.level) / speed, max_catchup=10000)
+    renderer.draw(state, False)
+    due = 0
+    for state in replay.ticks(state):
+        while not due:
+            stdscr.timeout(scheduler.wait_ms())
+            if stdscr.getch() in (ord('q'), ord('Q'), 27):
+                return state
+            due = scheduler.due()
+        due -= 1
+        if not due:  # Only the last of a batch of ticks is drawn
+            renderer.draw(state, False)
+    stdscr.timeout(-1)
+    stdscr.getch()
+    return state
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play back a snake replay")
+    parser.add_argument("replay")
+    parser.add_argument("--speed", type=float, default=1.0, help="speed multiplier for on-screen playback")
+    parser.add_argument("--headless", action="store_true", help="re-run without a screen as fast as possible")
+    parser.add_argument("--map", help="the level map the game was played on")
+    args = parser.parse_args()
+
+    replay = Replay.load(args.replay)
+    walls = None
+    map_path = args.map or replay.map_path  # The recorded map unless told otherwise
+    if map_path:
+        import maps
+        walls = maps.load(map_path)
+    try:
+        replay.new_state(walls)
+    except ValueError as error:
+        raise SystemExit(f"{args.replay}: {error}")
+    if args.headless:
+        start = time.perf_counter()
+        state = run(replay, walls)
+        elapsed = time.perf_counter() - start
+        outcome = "won" if state.won else "died" if state.dead else "stopped"
+        print(f"score {state.score}  length {len(state.snake)}  ticks {state.tick}  {outcome}  ({state.tick / max(elapsed, 1e-9):.0f} ticks/s)")
+    else:
+        state = curses.wrapper(play_on_screen, replay, args.speed, walls)
+        print(f"score {state.score}  ticks {state.tick}")
@@ -0,0 +1,138 @@
+# savegame.py
+# Save/restore of a running game for "Resume". The snapshot is a small
+# versioned binary blob: fixed header, Mersenne Twister state, then the
+# snake as packed (y, x) pairs, so its size follows the snake, not the
+# board. Loading rebuilds the board from the snake in bulk (Board(taken=)),
+# with the free cells in another order than the saved game's, so food after
+# a Resume lands on other (equally random) cells than it would have.
+# Saves are atomic: written to a temporary file, then renamed over the old.
+import os
+import struct
+from array import array
+from collections import deque
+from itertools import chain, compress, islice, repeat
+from operator import add, mul
+
+from board import Board
+from engine import GameState
+from replay import DIRECTION_CODES, CODE_DIRECTIONS, OPEN_BOARD
+
+MAGIC = b"SNKS"
+VERSION = 3
+# magic, version, height, width, level, direction, flags, score, eat_count,
+# tick, seed, bonus_duration, bonus_remaining, food y/x, bonus y/x, gauss,
+# length, map digest (maps.Map.digest)
+HEADER = struct.Struct("<4sBHHBBBIIIIddhhhhdI8s")
+RNG_WORDS = 625
+
+BONUS_ACTIVE = 1
+HAS_GAUSS = 2
+
+
+def pack_cells(cells, count):
+    return struct.pack(f"<{2 * count}H", *chain.from_iterable(cells))
+
+
+# The save as a list of buffers
+def snapshot(state, packed_snake=None):
+    version, words, gauss = state.rng.getstate()
+    flags = (BONUS_ACTIVE if state.bonus_active else 0) | (HAS_GAUSS if gauss is not None else 0)
+    food = state.food or (-1, -1)
+    bonus_food = state.bonus_food or (-1, -1)
+    header = HEADER.pack(MAGIC, VERSION, state.height, state.width, state.level,
+                         DIRECTION_CODES[state.direction], flags, state.score, state.eat_count,
+                         state.tick, state.seed, state.bonus_duration, state.bonus_remaining,
+                         food[0], food[1], bonus_food[0], bonus_food[1],
+                         gauss or 0.0, len(state.snake),
+                         state.walls.digest() if state.walls else OPEN_BOARD)
+    if packed_snake is None:
+        packed_snake = pack_cells(state.snake, len(state.snake))
+    return [header, array("I", words), packed_snake]
+
+
+class Snapshotter:
+    # Keeps the packed snake between saves and only packs the new head cells,
+    # so frequent autosaves of a long snake cost O(ticks since last save)
+    def __init__(self):
+        self.generation = None
+
+    def snapshot(self, state):
+        snake = state.snake
+        moved = state.pushes - self.pushes if state.generation == self.generation else -1
+        if 0 <= moved < len(snake):
+            kept = len(snake) - moved  # Cells of the previous save still in the body
+            packed = pack_cells(islice(snake, moved), moved) + self.packed[:kept * 4]
+        else:
+            packed = pack_cells(snake, len(snake))
+        self.packed = packed
+        self.generation = state.generation
+        self.pushes = state.pushes
+        return snapshot(state, packed)
+
+
+# `walls` is the level map the game was played on, if any
+def restore(data, walls=None):
+    (magic, version, height, width, level, direction, flags, score, eat_count, tick, seed,
+     bonus_duration, bonus_remaining, food_y, food_x, bonus_y, bonus_x,
+     gauss, length, map_digest) = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a snake save (or an unsupported version)")
+    if walls and (walls.rows, walls.width) != (height - 2, width):
+        raise ValueError("saved on a board of another size")
+    if map_digest != (walls.digest() if walls else OPEN_BOARD):
+        raise ValueError("saved on another map")
+
+    rows = height - 2
+    pos = HEADER.size
+    words = array("I")
+    words.frombytes(data[pos:pos + RNG_WORDS * 4])
+    pos += RNG_WORDS * 4
+    snake = array("H")
+    snake.frombytes(data[pos:pos + length * 4])
+    if len(words) != RNG_WORDS or len(snake) != 2 * length:
+        raise ValueError("truncated save")
+    ys = snake[0::2]
+    xs = snake[1::2]
+    if length and (max(ys) >= rows or max(xs) >= width):
+        # Partly off the board, left there by a resize
+        inside = [y < rows and x < width for y, x in zip(ys, xs)]
+        ys = array("H", compress(ys, inside))
+        xs = array("H", compress(xs, inside))
+    board = Board(rows, width, walls, array("i", map(add, map(mul, ys, repeat(width)), xs)))
+    it = iter(snake)
+    state = GameState(height, width, level, seed, walls, (deque(zip(it, it)), board))
+    state.rng.setstate((3, tuple(words), gauss if flags & HAS_GAUSS else None))
+
+    state.direction = CODE_DIRECTIONS[direction]
+    state.score = score
+    state.eat_count = eat_count
+    state.tick = tick
+    state.bonus_active = bool(flags & BONUS_ACTIVE)
+    state.bonus_duration = bonus_duration
+    state.bonus_remaining = bonus_remaining
+    state.food = (food_y, food_x) if food_y >= 0 else None
+    state.bonus_food = (bonus_y, bonus_x) if bonus_y >= 0 else None
+    return state
+
+
+# --- Files ---
+def save(path, state, snapshotter=None):
+    parts = snapshotter.snapshot(state) if snapshotter else snapshot(state)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        for part in parts:
+            f.write(part)
+    os.replace(tmp, path)
+
+
+# Raises OSError without a save, ValueError if it can't be restored
+def load(path, walls=None):
+    with open(path, "rb") as f:
+        return restore(f.read(), walls)
+
+
+def discard(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,37 @@
+# scheduler.py
+# Fixed-timestep clock for the game loop. Ticks are due at exact multiples of
+# the interval on time.monotonic(), however often the loop wakes up for input.
+import time
+
+
+class FixedStep:
+    def __init__(self, interval, clock=time.monotonic, max_catchup=5):
+        self.interval = interval
+        self.clock = clock
+        self.max_catchup = max_catchup  # Ticks run back-to-back before dropping the backlog
+        self.reset()
+
+    # Start counting from now, e.g. after a menu or when unpausing
+    def reset(self):
+        self.next_tick = self.clock() + self.interval
+
+    def set_interval(self, interval):
+        self.interval = interval
+        self.reset()
+
+    # Number of ticks that are due now; the caller runs them and renders once
+    def due(self):
+        now = self.clock()
+        if now < self.next_tick:
+            return 0
+        ticks = int((now - self.next_tick) / self.interval) + 1
+        if ticks > self.max_catchup:
+            # Stalled for too long (suspended terminal, debugger): don't fast-forward the game
+            self.next_tick = now + self.interval
+            return self.max_catchup
+        self.next_tick += ticks * self.interval
+        return ticks
+
+    # Milliseconds until the next tick, for a getch() timeout
+    def wait_ms(self):
+        return max(0, int((self.next_tick - self.clock()) * 1000 + 0.999))
@@ -0,0 +1,240 @@
+# scores.py
+# Local leaderboard in SQLite. Every finished game is a row: score, level,
+# board size, snake length, ticks, duration and the seed it was played with
+# (python replay.py needs the recording; the seed identifies it). The
+# database runs in WAL mode: results are inserted by a background thread, so
+# record() costs the game-over screen a queue put, and reads on the game
+# thread never wait for a write. Top-N and per-level bests are answered from
+# indexes, so they stay fast however many months of results pile up.
+#
+# Cabinets merge their boards with export/import; rows are unique per
+# (cabinet, finished, seed), so importing the same file twice is harmless.
+#
+#   python scores.py --top 10 [--level 3]
+#   python scores.py --best
+#   python scores.py --export cabinet1.jsonl
+#   python scores.py --import cabinet1.jsonl cabinet2.jsonl
+#   python scores.py --bench 2000000
+import argparse
+import json
+import queue
+import socket
+import sqlite3
+import sys
+import threading
+import time
+
+FIELDS = ("cabinet", "finished", "score", "level", "height", "width", "length", "ticks", "duration", "seed")
+LEVELS = range(1, 9)
+BATCH = 10000  # Rows per transaction when importing
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    cabinet TEXT NOT NULL,
+    finished REAL NOT NULL,   -- Unix time the game ended
+    score INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    height INTEGER NOT NULL,  -- Board size, like GameState
+    width INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    ticks INTEGER NOT NULL,
+    duration REAL NOT NULL,   -- Seconds of play
+    seed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC);
+CREATE INDEX IF NOT EXISTS scores_by_level ON scores (level, score DESC);
+CREATE UNIQUE INDEX IF NOT EXISTS scores_unique ON scores (cabinet, finished, seed);
+"""
+INSERT = (f"INSERT OR IGNORE INTO scores ({', '.join(FIELDS)}) "
+          f"VALUES ({', '.join('?' * len(FIELDS))})")
+
+
+def connect(path):
+    db = sqlite3.connect(path, timeout=10)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent; the last rows may be lost on power loss
+    db.executescript(SCHEMA)
+    return db
+
+
+def result_row(state, duration, cabinet):
+    return (cabinet, time.time(), state.score, state.level, state.height, state.width,
+            len(state.snake), state.tick, round(duration, 3), state.seed)
+
+
+# --- Queries ---
+def top(db, count=10, level=None):
+    # Best results as dicts, highest first (walks scores_by_score or scores_by_level)
+    if level is None:
+        cursor = db.execute(f"SELECT {', '.join(FIELDS)} FROM scores ORDER BY score DESC LIMIT ?", (count,))
+    else:
+        cursor = db.execute(f"SELECT {', '.join(FIELDS)} FROM scores WHERE level = ? "
+                            f"ORDER BY score DESC LIMIT ?", (level, count))
+    return [dict(zip(FIELDS, row)) for row in cursor]
+
+
+def best(db, level):
+    # One index seek; None before the first game at this level
+    return db.execute("SELECT MAX(score) FROM scores WHERE level = ?", (level,)).fetchone()[0]
+
+
+def best_per_level(db):
+    # A seek per level rather than GROUP BY, which would read the whole index
+    scores = {level: best(db, level) for level in LEVELS}
+    return {level: score for level, score in scores.items() if score is not None}
+
+
+# --- Game side ---
+class ScoreStore:
+    # Opening the database and every insert happen on the writer thread;
+    # the game thread has its own connection for reads, opened on first use.
+    def __init__(self, path, cabinet=""):
+        self.path = path
+        self.cabinet = cabinet or socket.gethostname()
+        self.reader = None
+        self.pending = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name="score-writer", daemon=True)
+        self.thread.start()
+
+    # Never blocks
+    def record(self, state, duration):
+        self.pending.put(result_row(state, duration, self.cabinet))
+
+    def run(self):
+        try:
+            db = connect(self.path)
+        except sqlite3.Error:
+            return  # Unwritable location etc.: play without a leaderboard
+        while True:
+            row = self.pending.get()
+            if row is None:
+                break
+            rows = [row]
+            while not self.pending.empty():  # Whatever queued up goes in one transaction
+                row = self.pending.get()
+                if row is None:
+                    break
+                rows.append(row)
+            try:
+                with db:
+                    db.executemany(INSERT, rows)
+            except sqlite3.Error:
+                pass
+            if row is None:
+                break
+        db.close()
+
+    def best(self, level):
+        # Best earlier score at this level, or None (also when the database
+        # can't be read, or the writer hasn't created it yet)
+        try:
+            if self.reader is None:
+                self.reader = sqlite3.connect(self.path, timeout=0.1)
+            return best(self.reader, level)
+        except sqlite3.Error:
+            return None
+
+    def close(self, timeout=2.0):
+        self.pending.put(None)
+        self.thread.join(timeout)
+        if self.reader:
+            self.reader.close()
+
+
+# --- Import / export ---
+def export_rows(db, out):
+    count = 0
+    for row in db.execute(f"SELECT {', '.join(FIELDS)} FROM scores ORDER BY id"):
+        out.write(json.dumps(dict(zip(FIELDS, row))) + "\n")
+        count += 1
+    return count
+
+
+def import_rows(db, lines):
+    # JSONL from export_rows; returns (rows read, rows new to this database)
+    read = added = 0
+    batch = []
+    for line in lines:
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        batch.append(tuple(result[field] for field in FIELDS))
+        read += 1
+        if len(batch) == BATCH:
+            added += insert_batch(db, batch)
+            batch = []
+    if batch:
+        added += insert_batch(db, batch)
+    return read, added
+
+
+def insert_batch(db, rows):
+    with db:
+        before = db.total_changes
+        db.executemany(INSERT, rows)
+        return db.total_changes - before
+
+
+# --- Benchmark ---
+def bench(db, rows):
+    import random
+    rng = random.Random(1)
+    started = time.perf_counter()
+    now = time.time()
+    for first in range(0, rows, BATCH):
+        insert_batch(db, [("bench", now - i, rng.randrange(2000), rng.randint(1, 8), 24, 80,
+                           rng.randrange(2, 400), rng.randrange(10000), rng.random() * 600, rng.randrange(2 ** 32))
+                          for i in range(first, min(rows, first + BATCH))])
+    print(f"insert {rows} rows: {time.perf_counter() - started:.2f}s")
+    for name, query in (("top 10", lambda: top(db, 10)),
+                        ("top 10 at level 3", lambda: top(db, 10, 3)),
+                        ("best at level 3", lambda: best(db, 3)),
+                        ("best per level", lambda: best_per_level(db))):
+        started = time.perf_counter()
+        for _ in range(100):
+            query()
+        print(f"{name}: {(time.perf_counter() - started) * 10:.3f} ms")
+
+
+def print_top(results):
+    print(f"{'#':>3} {'score':>7} {'level':>5} {'size':>9} {'length':>6} {'time':>7}  {'played':16} cabinet")
+    for rank, result in enumerate(results, 1):
+        played = time.strftime("%Y-%m-%d %H:%M", time.localtime(result["finished"]))
+        print(f"{rank:>3} {result['score']:>7} {result['level']:>5} {result['height']:>4}x{result['width']:<4} "
+              f"{result['length']:>6} {result['duration']:>6.0f}s  {played:16} {result['cabinet']}")
+
+
+if __name__ == "__main__":
+    from constants import DEFAULT_CONFIG
+    parser = argparse.ArgumentParser(description="Leaderboard")
+    parser.add_argument("--db", default=DEFAULT_CONFIG["scores_file"])
+    parser.add_argument("--top", type=int, metavar="N", help="show the N best results")
+    parser.add_argument("--level", type=int, help="only this level (with --top)")
+    parser.add_argument("--best", action="store_true", help="best score per level")
+    parser.add_argument("--export", metavar="FILE", help="write every result as JSONL ('-' for stdout)")
+    parser.add_argument("--import", dest="imports", nargs="+", metavar="FILE", help="merge JSONL exports")
+    parser.add_argument("--bench", type=int, metavar="ROWS", help="insert ROWS synthetic results and time the queries")
+    args = parser.parse_args()
+
+    db = connect(args.db)
+    if args.imports:
+        for path in args.imports:
+            with open(path, encoding="utf-8") as f:
+                read, added = import_rows(db, f)
+            print(f"{path}: {read} results, {added} new", file=sys.stderr)
+    if args.export:
+        if args.export == "-":
+            count = export_rows(db, sys.stdout)
+        else:
+            with open(args.export, "w", encoding="utf-8") as f:
+                count = export_rows(db, f)
+        print(f"exported {count} results", file=sys.stderr)
+    if args.bench:
+        bench(db, args.bench)
+    if args.top:
+        print_top(top(db, args.top, args.level))
+    if args.best:
+        for level, score in best_per_level(db).items():
+            print(f"level {level}: {score}")
+    db.close()
@@ -0,0 +1,221 @@
+# selfplay.py
+# Headless self-play for tuning speeds, bonus and scoring. Plays fixed-seed
+# games across all cores and reports score, length, ticks and cause of death
+# per (level, board size). Results are appended to a JSONL file as they come
+# in and only running totals are kept, so a sweep of any size runs in
+# constant memory.
+#
+#   python selfplay.py --games 100000 --levels 1-8 --sizes 24x80,50x160 --out runs.jsonl
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from engine import GameState, MOVES, BONUS, DEAD, WIN
+
+POLICIES = ("autopilot", "random", "straight")
+
+
+# --- Policies: called with the state each tick, return a direction or None ---
+def make_policy(name, seed):
+    if name == "autopilot":
+        from autopilot import Autopilot
+        return Autopilot().choose
+    if name == "random":
+        rng = random.Random(seed)
+        directions = list(MOVES)
+        return lambda state: rng.choice(directions) if rng.random() < 0.2 else None
+    return lambda state: None
+
+
+def death_cause(state):
+    # Called right after a DEAD step: what the head would have moved into
+    dy, dx = MOVES[state.direction]
+    y, x = state.snake[0]
+    cell = ((y + dy) % state.rows, (x + dx) % state.width)
+    return "tail" if cell == state.snake[-1] else "body"
+
+
+def play(level, height, width, seed, policy, max_ticks):
+    state = GameState(height, width, level, seed)
+    choose = make_policy(policy, seed)
+    bonuses = bonus_points = 0
+    cause = "tick_limit"
+    while state.tick < max_ticks:
+        score, eats = state.score, state.eat_count
+        event = state.step(choose(state))
+        if event == BONUS:  # Food eaten on the same move scores too
+            bonuses += 1
+            bonus_points += state.score - score - state.level * (state.eat_count - eats)
+        elif event == DEAD:
+            cause = death_cause(state)
+            break
+        elif event == WIN:
+            cause = "win"
+            break
+    return {"level": level, "height": height, "width": width, "seed": seed,
+            "policy": policy, "score": state.score, "length": len(state.snake),
+            "ticks": state.tick, "eats": state.eat_count, "bonuses": bonuses,
+            "bonus_points": bonus_points, "cause": cause}
+
+
+# Runs in a worker process; games go in chunks to keep pickling overhead low
+def play_chunk(specs, policy, max_ticks):
+    return [play(level, height, width, seed, policy, max_ticks)
+            for level, height, width, seed in specs]
+
+
+# --- Aggregation ---
+class Stat:
+    # Running count, mean and variance (Welford), min and max
+    __slots__ = ("count", "mean", "m2", "low", "high")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.low = math.inf
+        self.high = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.low = min(self.low, value)
+        self.high = max(self.high, value)
+
+    def summary(self):
+        std = math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+        return {"mean": round(self.mean, 3), "std": round(std, 3), "min": self.low, "max": self.high}
+
+
+FIELDS = ("score", "length", "ticks", "eats", "bonuses", "bonus_points")
+
+
+class Group:
+    def __init__(self):
+        self.stats = {field: Stat() for field in FIELDS}
+        self.causes = {}
+
+    def add(self, result):
+        for field in FIELDS:
+            self.stats[field].add(result[field])
+        self.causes[result["cause"]] = self.causes.get(result["cause"], 0) + 1
+
+    def summary(self):
+        games = self.stats["score"].count
+        summary = {field: stat.summary() for field, stat in self.stats.items()}
+        summary["games"] = games
+        summary["causes"] = {cause: round(count / games, 4) for cause, count in sorted(self.causes.items())}
+        return summary
+
+
+# --- Sweep ---
+def game_specs(levels, sizes, games, seed):
+    # Game i uses seed + i for every (level, size), so levels are compared on
+    # the same food sequences
+    for i in range(games):
+        for level, (height, width) in itertools.product(levels, sizes):
+            yield level, height, width, seed + i
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def sweep(args, out):
+    groups = {}
+    specs = chunked(game_specs(args.levels, args.sizes, args.games, args.seed), args.chunk)
+    total = args.games * len(args.levels) * len(args.sizes)
+    done = 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(args.workers) as pool:
+        pending = set()
+        for chunk in itertools.islice(specs, 2 * args.workers):
+            pending.add(pool.submit(play_chunk, chunk, args.policy, args.max_ticks))
+        # Keep a bounded number of chunks in flight; submit one per finished one
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                results = future.result()
+                if out:
+                    out.write("".join(json.dumps(result) + "\n" for result in results))
+                for result in results:
+                    key = (result["level"], result["height"], result["width"])
+                    groups.setdefault(key, Group()).add(result)
+                done += len(results)
+                chunk = next(specs, None)
+                if chunk:
+                    pending.add(pool.submit(play_chunk, chunk, args.policy, args.max_ticks))
+            if args.progress:
+                rate = done / (time.perf_counter() - started)
+                print(f"\r{done}/{total} games, {rate:.0f}/s", end="", file=sys.stderr)
+    if args.progress:
+        print(file=sys.stderr)
+    return groups
+
+
+def print_report(groups):
+    print(f"{'level':>5} {'size':>9} {'games':>8} {'score':>9} {'±':>7} {'length':>8} {'ticks':>9}  causes")
+    for (level, height, width), group in sorted(groups.items()):
+        summary = group.summary()
+        causes = " ".join(f"{cause}={share:.1%}" for cause, share in summary["causes"].items())
+        print(f"{level:>5} {height:>4}x{width:<4} {summary['games']:>8} "
+              f"{summary['score']['mean']:>9.1f} {summary['score']['std']:>7.1f} "
+              f"{summary['length']['mean']:>8.1f} {summary['ticks']['mean']:>9.1f}  {causes}")
+
+
+def parse_levels(text):
+    levels = set()
+    for part in text.split(","):
+        low, _, high = part.partition("-")
+        levels.update(range(int(low), int(high or low) + 1))
+    if not levels <= set(range(1, 9)):
+        raise argparse.ArgumentTypeError("levels are 1-8")
+    return sorted(levels)
+
+
+def parse_sizes(text):
+    try:
+        return [tuple(int(n) for n in size.split("x")) for size in text.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError("sizes look like 24x80,50x160")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play headless games in parallel and aggregate the results")
+    parser.add_argument("--games", type=int, default=100, help="games per level and size")
+    parser.add_argument("--levels", type=parse_levels, default=parse_levels("1-8"))
+    parser.add_argument("--sizes", type=parse_sizes, default=parse_sizes("24x80"), help="terminal sizes, HxW")
+    parser.add_argument("--policy", choices=POLICIES, default="autopilot")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--max-ticks", type=int, default=100000, help="stop a game after this many ticks")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk", type=int, default=16, help="games per task")
+    parser.add_argument("--out", help="append every result to this JSONL file")
+    parser.add_argument("--summary", help="write the aggregates to this JSON file")
+    parser.add_argument("--progress", action="store_true")
+    args = parser.parse_args()
+
+    out = open(args.out, "a", encoding="utf-8") if args.out else None
+    try:
+        groups = sweep(args, out)
+    finally:
+        if out:
+            out.close()
+    print_report(groups)
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump([{"level": level, "height": height, "width": width, **group.summary()}
+                       for (level, height, width), group in sorted(groups.items())], f, indent=2)
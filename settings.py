@@ -0,0 +1,213 @@
+# settings.py
+# Configuration service. The file is parsed once and cached until its mtime
+# changes; values are checked against a schema built from DEFAULT_CONFIG and
+# deep-merged over the defaults. Callers always get their own copy. Saves are
+# coalesced and written atomically by a background thread.
+import atexit
+import copy
+import os
+import threading
+import time
+
+from constants import DEFAULT_CONFIG, CONFIG_FILE
+
+RANGES = {"level": (1, 8), "input_queue_depth": (1, 64), "autosave_ticks": (0, 2 ** 31),
+          "board_rows": (0, 10000), "board_columns": (0, 10000)}
+CHOICES = {"input_drop_policy": ("newest", "oldest"), "remote_play": ("off", "on", "auto")}
+WRITE_DELAY = 0.25  # Seconds to wait for more changes before writing
+
+
+# --- Schema ---
+def check_color(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, (list, tuple)) and len(value) == 3 and all(isinstance(v, int) for v in value):
+        return tuple(value)  # RGB from customize_colors
+    raise ValueError(value)
+
+
+def check_pair(value):
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        raise ValueError(value)
+    return (check_color(value[0]), check_color(value[1]))  # JSON turns tuples into lists
+
+
+def merge_elements(value, defaults):
+    if not isinstance(value, dict):
+        raise ValueError(value)
+    merged = dict(defaults)
+    for element, pair in value.items():
+        try:
+            merged[element] = check_pair(pair)
+        except ValueError:
+            pass
+    return merged
+
+
+def merge_themes(value, defaults):
+    if not isinstance(value, dict):
+        raise ValueError(value)
+    merged = {theme: dict(elements) for theme, elements in defaults.items()}
+    for theme, elements in value.items():
+        try:
+            merged[theme] = merge_elements(elements, defaults.get(theme, defaults["Default"]))
+        except ValueError:
+            pass
+    return merged
+
+
+def scalar_checker(key, default):
+    kind = type(default)
+    low, high = RANGES.get(key, (None, None))
+    choices = CHOICES.get(key)
+
+    def check(value, default):
+        if type(value) is not kind:
+            raise ValueError(value)
+        if low is not None and not low <= value <= high:
+            raise ValueError(value)
+        if choices and value not in choices:
+            raise ValueError(value)
+        return value
+    return check
+
+
+def compile_schema(defaults):
+    schema = {}
+    for key, default in defaults.items():
+        if key == "colors":
+            schema[key] = merge_themes
+        elif key == "custom_colors":
+            schema[key] = merge_elements
+        else:
+            schema[key] = scalar_checker(key, default)
+    return schema
+
+
+SCHEMA = compile_schema(DEFAULT_CONFIG)
+
+
+def validate(raw):
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    if not isinstance(raw, dict):
+        return config
+    for key, check in SCHEMA.items():
+        if key in raw:
+            try:
+                config[key] = check(raw[key], DEFAULT_CONFIG[key])
+            except ValueError:
+                pass  # Keep the default for a bad value
+    return config
+
+
+# --- Cached loading ---
+_lock = threading.Lock()
+_cached = None
+_stamp = None
+
+
+def file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def load(path=CONFIG_FILE):
+    global _cached, _stamp
+    stamp = file_stamp(path)
+    with _lock:
+        if _cached is not None and stamp == _stamp:
+            return copy.deepcopy(_cached)
+    raw = None
+    if stamp is not None:
+        import json  # json pulls in re/enum; only pay for it when there is a file
+        try:
+            with open(path, "r") as f:
+                raw = json.load(f)
+        except json.JSONDecodeError:
+            print("Error: Invalid config file.  Using default settings.")
+        except OSError:
+            pass
+    config = validate(raw)
+    with _lock:
+        _cached, _stamp = config, stamp
+        return copy.deepcopy(config)
+
+
+# --- Write-behind saving ---
+class Writer:
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.pending = None  # (path, config) still to be written
+        self.writing = False
+        self.flushing = False
+        self.thread = None
+
+    def submit(self, path, config):
+        with self.cond:
+            self.pending = (path, config)  # A newer save replaces an unwritten one
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="config-writer", daemon=True)
+                self.thread.start()
+            self.cond.notify_all()
+
+    def run(self):
+        while True:
+            with self.cond:
+                while self.pending is None:
+                    self.cond.wait()
+                deadline = time.monotonic() + WRITE_DELAY  # Let rapid saves coalesce
+                while not self.flushing and time.monotonic() < deadline:
+                    self.cond.wait(deadline - time.monotonic())
+                path, config = self.pending
+                self.pending = None
+                self.writing = True
+            try:
+                write_atomic(path, config)
+            finally:
+                with self.cond:
+                    self.writing = False
+                    self.cond.notify_all()
+
+    # Block until everything submitted so far is on disk
+    def flush(self, timeout=2.0):
+        with self.cond:
+            self.flushing = True
+            self.cond.notify_all()
+            self.cond.wait_for(lambda: self.pending is None and not self.writing, timeout)
+            self.flushing = False
+
+
+def write_atomic(path, config):
+    global _stamp
+    import json
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w") as f:
+            json.dump(config, f, indent=4)
+        os.replace(tmp, path)
+    except OSError:
+        return
+    with _lock:
+        if _cached is config:
+            _stamp = file_stamp(path)
+
+
+_writer = Writer()
+
+
+def save(config, path=CONFIG_FILE):
+    global _cached
+    snapshot = copy.deepcopy(config)
+    with _lock:
+        _cached = snapshot  # Later loads see the change before it reaches the disk
+    _writer.submit(path, snapshot)
+
+
+def flush():
+    _writer.flush()
+
+
+atexit.register(flush)
@@ -0,0 +1,457 @@
+# spectate.py
+# Live spectating over TCP or a Unix socket. The game draws through a
+# TeeTarget, which mirrors every frame into a shadow grid and hands the
+# changed cells to a SpectatorServer. The server runs asyncio on its own
+# thread, keeps the full screen for keyframes, and sends each spectator cell
+# deltas. A spectator that can't keep up skips frames and gets a keyframe
+# when it catches up, or is dropped; the game loop never waits on a socket.
+#
+#   python main.py --spectate 7777            play and stream
+#   python spectate.py --connect HOST:7777    watch
+#   python spectate.py --load-test 300        loopback load test
+import argparse
+import asyncio
+import curses
+import socket
+import struct
+import threading
+import time
+
+import palette
+
+# --- Wire format ---
+# Every message is a 4-byte little-endian length followed by the payload.
+# Payload: a type byte, then
+#   KEYFRAME: height, width (H H), palette, then runs covering the screen
+#   DELTA:    flags (B, CLEARED = screen was erased first), then runs
+# palette = count (B), then (pair, fg, bg) as (B h h); colors run up to 255, -1 is the default
+# run = y, x, byte length (H H H), attr (B: pair | BOLD), UTF-8 text
+KEYFRAME = 0x4B  # "K"
+DELTA = 0x44     # "D"
+CLEARED = 1
+BOLD = 0x80
+
+LENGTH = struct.Struct("<I")
+SIZE = struct.Struct("<HH")
+RUN = struct.Struct("<HHHB")
+PAIR = struct.Struct("<Bhh")
+
+
+def pack_attr(attr):
+    pair = (attr & curses.A_COLOR) >> 8
+    return (pair & 0x7F) | (BOLD if attr & curses.A_BOLD else 0)
+
+
+def unpack_attr(byte):
+    attr = curses.color_pair(byte & 0x7F) if byte & 0x7F else 0
+    return attr | (curses.A_BOLD if byte & BOLD else 0)
+
+
+def encode_runs(cells, out):
+    # cells: {(y, x): (char, attr_byte)}; consecutive cells on a row with the
+    # same attribute become one run
+    run = None
+    for (y, x) in sorted(cells):
+        char, attr = cells[(y, x)]
+        if run and run[0] == y and run[1] + len(run[3]) == x and run[2] == attr:
+            run[3].append(char)
+            continue
+        if run:
+            write_run(run, out)
+        run = [y, x, attr, [char]]
+    if run:
+        write_run(run, out)
+
+
+def write_run(run, out):
+    text = "".join(run[3]).encode("utf-8")
+    out += RUN.pack(run[0], run[1], len(text), run[2])
+    out += text
+
+
+def encode_palette(out):
+    pairs = palette.pairs()
+    out.append(len(pairs))
+    for pair, (fg, bg) in pairs:
+        out += PAIR.pack(pair, fg, bg)
+
+
+def frame_message(payload):
+    return LENGTH.pack(len(payload)) + payload
+
+
+# --- Game side ---
+class TeeTarget:
+    # Forwards everything to the real target and mirrors the drawing into a
+    # shadow grid; on refresh() the cells that changed go to the server.
+    def __init__(self, target, server):
+        self.target = target
+        self.server = server
+        self.reset_shadow()
+
+    def reset_shadow(self):
+        self.size = self.target.getmaxyx()
+        self.shadow = {}
+        self.changes = {}
+        self.cleared = True
+
+    def getmaxyx(self):
+        return self.target.getmaxyx()
+
+    def addstr(self, y, x, text, attr=0):
+        height, width = self.size
+        if 0 <= y < height:
+            packed = pack_attr(attr)
+            shadow = self.shadow
+            changes = self.changes
+            for i, char in enumerate(text[:max(0, width - x)], x):
+                cell = (char, packed)
+                if shadow.get((y, i)) != cell:
+                    shadow[(y, i)] = cell
+                    changes[(y, i)] = cell
+        self.target.addstr(y, x, text, attr)  # May raise curses.error, like the target
+
+    def erase(self):
+        self.target.erase()
+        self.reset_shadow()
+
+    def clear(self):
+        self.target.clear()
+        self.reset_shadow()
+
+    def refresh(self):
+        self.target.refresh()
+        self.publish()
+
+    def noutrefresh(self):
+        self.target.noutrefresh()
+        self.publish()
+
+    def publish(self):
+        if self.changes or self.cleared:
+            self.server.publish(self.size, self.cleared, self.changes)
+            self.changes = {}
+            self.cleared = False
+
+    # Spectators see the menus too, so they are drawn through the tee and
+    # the game is repainted afterwards
+    def overlay(self):
+        return self
+
+    def restore(self):
+        return False
+
+    def getch(self):
+        key = self.target.getch()
+        if key == curses.KEY_RESIZE:
+            self.reset_shadow()
+        return key
+
+    def __getattr__(self, name):
+        return getattr(self.target, name)
+
+
+# --- Server ---
+class Spectator:
+    def __init__(self, writer):
+        self.writer = writer
+        self.needs_keyframe = True
+        self.lagging_since = None
+        self.frames = 0
+        self.skipped = 0
+
+
+class SpectatorServer:
+    def __init__(self, host="127.0.0.1", port=0, unix_path=None,
+                 max_buffer=64 * 1024, max_lag=5.0, send_buffer=None):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.max_buffer = max_buffer  # Unsent bytes before a spectator skips frames
+        self.max_lag = max_lag        # Seconds of skipping before it is dropped
+        self.send_buffer = send_buffer  # SO_SNDBUF; smaller means fresher frames
+        self.spectators = set()
+        self.grid = {}
+        self.size = (0, 0)
+        self.loop = None
+        self.ready = threading.Event()
+        self.published = 0
+        self.dropped = 0
+        self.skipped = 0  # Frames skipped, counting spectators dropped since
+
+    # --- Called from the game thread ---
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="spectator-server", daemon=True)
+        self.thread.start()
+        self.ready.wait(5)
+        return self
+
+    def publish(self, size, cleared, changes):
+        if self.loop is None:
+            return
+        self.published += 1
+        self.loop.call_soon_threadsafe(self.broadcast, size, cleared, changes)
+
+    def stop(self):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.stopping.set)
+            self.thread.join(2)
+
+    # --- Server thread ---
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self.serve_until_stopped())
+        finally:
+            self.ready.set()  # Don't leave start() waiting if binding failed
+            self.loop.close()
+
+    async def serve_until_stopped(self):
+        self.stopping = asyncio.Event()
+        if self.unix_path:
+            server = await asyncio.start_unix_server(self.serve, self.unix_path)
+        else:
+            server = await asyncio.start_server(self.serve, self.host, self.port)
+            self.port = server.sockets[0].getsockname()[1]
+        self.ready.set()
+        await self.stopping.wait()
+        server.close()
+        for spectator in list(self.spectators):
+            spectator.writer.transport.abort()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def serve(self, reader, writer):
+        spectator = Spectator(writer)
+        sock = writer.get_extra_info("socket")
+        if self.send_buffer and sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer)
+        self.spectators.add(spectator)
+        if self.size != (0, 0):
+            self.send_keyframe(spectator)
+        try:
+            while await reader.read(1024):  # Spectators only listen; wait for them to leave
+                pass
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.spectators.discard(spectator)
+            writer.close()
+
+    def broadcast(self, size, cleared, changes):
+        resized = size != self.size
+        if resized or cleared:
+            self.grid = {}
+            self.size = size
+        self.grid.update(changes)
+        if resized:
+            for spectator in self.spectators:
+                spectator.needs_keyframe = True
+
+        delta = None
+        now = time.monotonic()
+        for spectator in list(self.spectators):
+            transport = spectator.writer.transport
+            if transport.is_closing():
+                self.spectators.discard(spectator)
+                continue
+            if transport.get_write_buffer_size() > self.max_buffer:
+                # Behind: skip this frame and resync with a keyframe later
+                spectator.skipped += 1
+                self.skipped += 1
+                spectator.needs_keyframe = True
+                if spectator.lagging_since is None:
+                    spectator.lagging_since = now
+                elif now - spectator.lagging_since > self.max_lag:
+                    self.spectators.discard(spectator)
+                    transport.abort()
+                    self.dropped += 1
+                continue
+            spectator.lagging_since = None
+            if spectator.needs_keyframe:
+                self.send_keyframe(spectator)
+                continue
+            if delta is None:
+                payload = bytearray([DELTA, CLEARED if cleared else 0])
+                encode_runs(changes, payload)
+                delta = frame_message(bytes(payload))
+            spectator.writer.write(delta)
+            spectator.frames += 1
+
+    def send_keyframe(self, spectator):
+        payload = bytearray([KEYFRAME])
+        payload += SIZE.pack(*self.size)
+        encode_palette(payload)
+        encode_runs(self.grid, payload)
+        spectator.writer.write(frame_message(bytes(payload)))
+        spectator.needs_keyframe = False
+        spectator.frames += 1
+
+
+def parse_address(address):
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+# --- Client ---
+def read_runs(payload, pos):
+    while pos < len(payload):
+        y, x, length, attr = RUN.unpack_from(payload, pos)
+        pos += RUN.size
+        yield y, x, payload[pos:pos + length].decode("utf-8"), attr
+        pos += length
+
+
+async def watch(stdscr, reader):
+    while True:
+        header = await reader.readexactly(LENGTH.size)
+        payload = await reader.readexactly(LENGTH.unpack(header)[0])
+        if payload[0] == KEYFRAME:
+            stdscr.erase()
+            pos = 1 + SIZE.size
+            for _ in range(payload[pos]):
+                pair, fg, bg = PAIR.unpack_from(payload, pos + 1)
+                curses.init_pair(pair, fg, bg)
+                pos += PAIR.size
+            pos += 1
+        else:
+            if payload[1] & CLEARED:
+                stdscr.erase()
+            pos = 2
+        for y, x, text, attr in read_runs(payload, pos):
+            try:
+                stdscr.addstr(y, x, text, unpack_attr(attr))
+            except curses.error:
+                pass
+        stdscr.refresh()
+
+
+async def wait_for_quit(stdscr):
+    while stdscr.getch() not in (ord('q'), ord('Q')):
+        await asyncio.sleep(0.05)
+
+
+def run_client(stdscr, address=None, unix_path=None):
+    curses.curs_set(0)
+    curses.start_color()
+    curses.use_default_colors()
+    stdscr.nodelay(True)
+
+    async def client():
+        if unix_path:
+            reader, writer = await asyncio.open_unix_connection(unix_path)
+        else:
+            reader, writer = await asyncio.open_connection(*parse_address(address))
+        tasks = [asyncio.ensure_future(watch(stdscr, reader)),
+                 asyncio.ensure_future(wait_for_quit(stdscr))]
+        # Either the game ends (the server closes the stream) or Q is pressed
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        writer.close()
+    asyncio.run(client())
+
+
+# --- Load test ---
+def load_test(count, seconds, slow, fps):
+    from engine import GameState
+    from render import Renderer
+    from targets import FrameBuffer
+    from constants import DEFAULT_CONFIG
+
+    # The smallest socket buffers the kernel allows (it rounds 1 up), a small
+    # write buffer and a short lag limit, so stalled spectators hit them quickly
+    server = SpectatorServer(max_buffer=1024, max_lag=1.0, send_buffer=1).start()
+    stats = {"bytes": 0, "messages": 0}
+    stalled_addresses = set()
+
+    async def spectator(index):
+        stalled = index < slow  # The first `slow` spectators stop reading
+        sock = socket.socket()
+        if stalled:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1)
+        sock.connect(("127.0.0.1", server.port))
+        if stalled:
+            # A raw socket nobody reads: a StreamReader would keep draining
+            # it into its own buffer
+            stalled_addresses.add(sock.getsockname())
+            try:
+                await asyncio.sleep(3600)
+            except asyncio.CancelledError:
+                pass
+            sock.close()
+            return
+        reader, writer = await asyncio.open_connection(sock=sock)
+        try:
+            while True:
+                header = await reader.readexactly(LENGTH.size)
+                payload = await reader.readexactly(LENGTH.unpack(header)[0])
+                stats["bytes"] += LENGTH.size + len(payload)
+                stats["messages"] += 1
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def spectators():
+        tasks = [asyncio.ensure_future(spectator(i)) for i in range(count)]
+        await asyncio.sleep(seconds + 1)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    client_thread = threading.Thread(target=lambda: asyncio.run(spectators()), daemon=True)
+    client_thread.start()
+    time.sleep(0.5)  # Let them connect
+
+    screen = TeeTarget(FrameBuffer(50, 160), server)
+    state = GameState(50, 160, 8, seed=1)
+    renderer = Renderer(screen, DEFAULT_CONFIG)
+    frames = 0
+    total = worst = 0.0
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        start = time.perf_counter()
+        if state.step(("up", "left", "down", "right", None, None)[frames % 6]) == "dead":
+            state.reset()
+        renderer.draw(state, False)
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        worst = max(worst, elapsed)
+        frames += 1
+        time.sleep(1.0 / fps)
+    # Every stalled spectator must have been skipped, or dropped altogether
+    connected = {spectator.writer.get_extra_info("peername"): spectator
+                 for spectator in list(server.spectators)}
+    gone = sum(1 for address in stalled_addresses if address not in connected)
+    unnoticed = sum(1 for address in stalled_addresses
+                    if address in connected and not connected[address].skipped)
+    client_thread.join()
+    server.stop()
+    print(f"{count} spectators ({slow} stalled), {frames} frames in {seconds}s")
+    print(f"  game-side frame time: mean {total / frames * 1000:.2f} ms, worst {worst * 1000:.2f} ms")
+    print(f"  delivered {stats['messages']} messages, {stats['bytes'] / 1024:.0f} KiB")
+    print(f"  skipped {server.skipped} frames for lagging spectators, dropped {server.dropped} "
+          f"({gone} of {slow} stalled gone)")
+    if unnoticed:
+        raise SystemExit(f"load test failed: {unnoticed} stalled spectators were never skipped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch a snake game, or load-test the spectator server")
+    parser.add_argument("--connect", metavar="HOST:PORT")
+    parser.add_argument("--unix", metavar="PATH")
+    parser.add_argument("--load-test", type=int, metavar="SPECTATORS")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--slow", type=int, default=0, help="spectators that stop reading (load test)")
+    parser.add_argument("--fps", type=float, default=100.0, help="frames per second to publish (load test)")
+    args = parser.parse_args()
+    if args.load_test:
+        load_test(args.load_test, args.seconds, args.slow, args.fps)
+    elif args.connect or args.unix:
+        curses.wrapper(run_client, args.connect, args.unix)
+    else:
+        parser.print_help()
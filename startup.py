@@ -0,0 +1,23 @@
+# startup.py
+# Phase timer for `python main.py --profile-startup`: each mark() records the
+# time since the previous one, report() formats the table printed on exit.
+import time
+
+
+class StartupProfile:
+    def __init__(self, started):
+        self.started = started
+        self.last = started
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self):
+        lines = ["Startup profile (ms):"]
+        for phase, seconds in self.phases:
+            lines.append(f"  {phase:<16}{seconds * 1000:8.2f}")
+        lines.append(f"  {'first frame':<16}{(self.last - self.started) * 1000:8.2f}")
+        return "\n".join(lines)
@@ -0,0 +1,234 @@
+# targets.py
+# Render targets. Everything that draws takes a window-like object; these
+# classes provide the subset of the curses window API the game uses, so the
+# same drawing code can go to curses, to an in-memory cell grid, or out as a
+# raw ANSI stream. Each target caches the screen size for the whole frame.
+import curses
+import os
+import sys
+
+import palette
+
+
+class CursesTarget:
+    def __init__(self, stdscr):
+        self.stdscr = stdscr
+        self.size = stdscr.getmaxyx()
+
+    def getmaxyx(self):
+        return self.size
+
+    def addstr(self, y, x, text, attr=0):
+        self.stdscr.addstr(y, x, text, attr)
+
+    # A full repaint starts a new frame: pick up the current size
+    def erase(self):
+        self.size = self.stdscr.getmaxyx()
+        self.stdscr.erase()
+
+    def clear(self):
+        self.size = self.stdscr.getmaxyx()
+        self.stdscr.clear()
+
+    def refresh(self):
+        self.stdscr.refresh()
+
+    def getch(self):
+        key = self.stdscr.getch()
+        if key == curses.KEY_RESIZE:
+            self.size = self.stdscr.getmaxyx()
+        return key
+
+    # --- Overlays (menus over the game) ---
+    # overlay() gives a screen to draw a menu on without touching the game
+    # frame; restore() puts the frame back and returns False when the caller
+    # has to repaint it instead. Curses keeps the frame in stdscr and the
+    # menu in a window of its own, so restoring is one touchwin/doupdate.
+    def overlay(self):
+        window = curses.newwin(*self.size, 0, 0)
+        window.keypad(True)
+        return CursesTarget(window)
+
+    def restore(self):
+        if self.stdscr.getmaxyx() != self.size:
+            return False  # Resized under the menu: the frame is stale
+        self.stdscr.touchwin()
+        self.stdscr.noutrefresh()
+        curses.doupdate()
+        return True
+
+    # timeout, nodelay, getstr, keypad... go straight to the window
+    def __getattr__(self, name):
+        return getattr(self.stdscr, name)
+
+
+class FrameBuffer:
+    # Cell grid for headless runs and tests. Keys are scripted; when they run
+    # out getch() returns `idle_key` (-1, like a curses timeout).
+    def __init__(self, height, width, keys=(), idle_key=-1):
+        self.keys = list(keys)
+        self.idle_key = idle_key
+        self.resize(height, width)
+
+    def resize(self, height, width):
+        self.height = height
+        self.width = width
+        self.chars = [[" "] * width for _ in range(height)]
+        self.attrs = [[0] * width for _ in range(height)]
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def addstr(self, y, x, text, attr=0):
+        if not 0 <= y < self.height or x >= self.width:
+            raise curses.error("addstr outside the buffer")
+        chars = self.chars[y]
+        attrs = self.attrs[y]
+        end = min(self.width, x + len(text))
+        chars[x:end] = text[:end - x]
+        attrs[x:end] = [attr] * (end - x)
+        if end - x < len(text):
+            raise curses.error("addstr past the right edge")  # Same as curses
+
+    def erase(self):
+        for row in self.chars:
+            row[:] = [" "] * self.width
+        for row in self.attrs:
+            row[:] = [0] * self.width
+
+    clear = erase
+
+    def refresh(self):
+        pass
+
+    noutrefresh = refresh
+
+    def getch(self):
+        return self.keys.pop(0) if self.keys else self.idle_key
+
+    # The menu draws over the grid; a copy taken beforehand is the frame
+    def overlay(self):
+        self.saved = [row[:] for row in self.chars], [row[:] for row in self.attrs]
+        return self
+
+    def restore(self):
+        self.chars, self.attrs = self.saved
+        return True
+
+    def nodelay(self, flag):
+        pass
+
+    def timeout(self, delay):
+        pass
+
+    def keypad(self, flag):
+        pass
+
+    def text(self):
+        return "\n".join("".join(row) for row in self.chars)
+
+
+# --- ANSI output ---
+CSI = "\x1b["
+BOLD_ATTRS = curses.A_BOLD | curses.A_STANDOUT
+
+
+def ansi_color(color, base):
+    if color < 0:
+        return str(base + 9)  # Terminal default
+    if color < 8:
+        return str(base + color)
+    return f"{base + 8};5;{color}"
+
+
+def sgr(attr):
+    codes = ["0"]
+    pair = (attr & curses.A_COLOR) >> 8  # curses.pair_number() needs initscr()
+    if pair:
+        fg, bg = palette.pair_colors(pair)
+        codes += [ansi_color(fg, 30), ansi_color(bg, 40)]
+    if attr & BOLD_ATTRS:
+        codes.append("1")
+    if attr & curses.A_REVERSE:
+        codes.append("7")
+    return CSI + ";".join(codes) + "m"
+
+
+class AnsiTarget:
+    # Writes escape sequences to a file descriptor. Draw calls are collected
+    # and the whole frame goes out in a single write() on refresh(). Input
+    # (getch, timeout...) comes from `keys`, usually the curses window.
+    def __init__(self, fd=None, keys=None, size=None):
+        self.fd = sys.stdout.fileno() if fd is None else fd
+        self.keys = keys
+        self.fixed_size = size is not None
+        self.size = size or self.terminal_size()
+        self.out = []
+        self.attr = None
+        self.cursor = None  # Where the terminal's cursor is after our output, if known
+        self.bytes_written = 0
+        self.frames = 0
+
+    def terminal_size(self):
+        try:
+            columns, lines = os.get_terminal_size(self.fd)
+        except OSError:
+            columns, lines = 80, 24
+        return lines, columns
+
+    def getmaxyx(self):
+        return self.size
+
+    def addstr(self, y, x, text, attr=0):
+        height, width = self.size
+        if not 0 <= y < height or x >= width:
+            raise curses.error("addstr outside the screen")
+        if x + len(text) > width:
+            text = text[:width - x]
+        if attr != self.attr:
+            self.out.append(sgr(attr))
+            self.attr = attr
+        if (y, x) != self.cursor:  # Text that continues the last write needs no move
+            self.out.append(f"{CSI}{y + 1};{x + 1}H")
+        self.out.append(text)
+        end = x + len(text)
+        self.cursor = (y, end) if end < width else None  # At the edge it depends on the terminal
+
+    def erase(self):
+        if not self.fixed_size:
+            self.size = self.keys.getmaxyx() if self.keys is not None else self.terminal_size()
+        self.out.append(CSI + "0m" + CSI + "2J")
+        self.attr = None
+        self.cursor = None
+
+    clear = erase
+
+    def refresh(self):
+        if not self.out:
+            return
+        data = "".join(self.out).encode("utf-8")
+        self.out = []
+        view = memoryview(data)
+        while view:
+            written = os.write(self.fd, view)
+            view = view[written:]
+        self.bytes_written += len(data)
+        self.frames += 1
+
+    noutrefresh = refresh
+
+    # Nothing on the far side keeps a copy of the frame: the caller repaints
+    def overlay(self):
+        return self
+
+    def restore(self):
+        return False
+
+    def getch(self):
+        key = self.keys.getch()
+        if key == curses.KEY_RESIZE:
+            self.size = self.keys.getmaxyx()
+        return key
+
+    def __getattr__(self, name):
+        return getattr(self.keys, name)
@@ -0,0 +1,60 @@
+# turnqueue.py
+# Bounded queue of pending turns. All keys read during a tick are queued and
+# the game applies at most one per tick, so quick UP-then-LEFT presses both
+# land instead of the second one being dropped or reversing into the neck.
+import time
+from collections import deque
+from engine import OPPOSITE
+
+DROP_NEWEST = "newest"  # Full queue ignores the new key
+DROP_OLDEST = "oldest"  # Full queue forgets the oldest pending turn
+
+
+class TurnQueue:
+    def __init__(self, depth=3, drop=DROP_NEWEST, clock=time.monotonic):
+        self.depth = max(1, depth)
+        self.drop = drop
+        self.clock = clock
+        self.turns = deque()            # (direction, time the key was read)
+        self.applied = []               # Key times of turns waiting to be shown
+        self.latencies = deque(maxlen=256)  # Key-to-screen, in seconds
+        self.dropped = 0
+
+    def clear(self):
+        self.turns.clear()
+        self.applied = []
+
+    # Queue a turn unless it repeats or reverses the one before it
+    def push(self, direction, current):
+        last = self.turns[-1][0] if self.turns else current
+        if direction == last or direction == OPPOSITE[last]:
+            return False
+        if len(self.turns) >= self.depth:
+            self.dropped += 1
+            if self.drop == DROP_NEWEST:
+                return False
+            self.turns.popleft()
+        self.turns.append((direction, self.clock()))
+        return True
+
+    # Next turn for this tick, or None to keep going straight
+    def pop(self):
+        if not self.turns:
+            return None
+        direction, pressed_at = self.turns.popleft()
+        self.applied.append(pressed_at)
+        return direction
+
+    # Call after the frame showing the applied turns has been refreshed
+    def presented(self):
+        if self.applied:
+            now = self.clock()
+            for pressed_at in self.applied:
+                self.latencies.append(now - pressed_at)
+            self.applied = []
+
+    # (mean, max) input-to-screen latency in milliseconds over recent turns
+    def latency_ms(self):
+        if not self.latencies:
+            return 0.0, 0.0
+        return 1000 * sum(self.latencies) / len(self.latencies), 1000 * max(self.latencies)